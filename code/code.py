@@ -1,12 +1,19 @@
 import intro
+import settings
+from hardware_helpers import temp_helper, dfplayer_helper
+from scheduler import Scheduler
 from screen_manager import ScreenManager
 
 intro.playIntro()
 
 sm = ScreenManager()
+dfplayer_helper.refresh_inventory()
 
-while True:
-    sm.show()
+scheduler = Scheduler()
+scheduler.add_task(sm.read_buttons, 10)
+scheduler.add_task(sm.refresh, 400)
+scheduler.add_task(temp_helper.sample, temp_helper.sample_period_ms)
+scheduler.add_task(dfplayer_helper.update, 10)
+scheduler.add_task(settings.store.update, 500)
 
-
- 
\ No newline at end of file
+scheduler.run()
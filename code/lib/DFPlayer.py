@@ -14,7 +14,7 @@
 import board
 import time
 import busio
-import struct
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff, ticks_less
 
 class DFPlayer(object):
 
@@ -37,6 +37,19 @@ class DFPlayer(object):
   STATUS_BUSY    = 0x0201
   STATUS_PAUSED  = 0x0202
 
+  EVENT_CARD_INSERTED   = 0x3A
+  EVENT_CARD_REMOVED    = 0x3B
+  EVENT_U_DISK_FINISHED = 0x3C
+  EVENT_TRACK_FINISHED  = 0x3D             # SD card
+  EVENT_FLASH_FINISHED  = 0x3E
+  EVENT_INITIALIZED     = 0x3F
+  EVENT_ERROR           = 0x40
+  EVENT_ACK             = 0x41
+
+  _COALESCED = (0x06, 0x07)                # set_volume, set_eq
+  _TRANSPORT = (0x03, 0x0D, 0x0E, 0x0F,    # play, resume, pause, play folder
+                0x12, 0x16, 0x18)          # play mp3 folder, stop, random
+
   # --- constructor   --------------------------------------------------------
 
   def __init__(self,uart=None,media=None,volume=50,eq=None,latency=0.100):
@@ -44,60 +57,154 @@ class DFPlayer(object):
       self._uart = busio.UART(board.TX,board.RX,baudrate=9600)
     else:
       self._uart = uart
-    self._latency = latency
+    self._latency_ms = int(latency * 1000)
+    self._queue = []
+    self._ready_at = ticks_ms()
+    # Start, version, length, command, feedback, DataH, DataL, checksum, end
+    self._out_buf = bytearray(b'\x7E\xFF\x06\x00\x00\x00\x00\x00\x00\xEF')
+    self._in_buf  = bytearray(10)
+    self._in_pos  = 0
+    self._rx_buf  = bytearray(32)
+    self._rx_view = memoryview(self._rx_buf)
+    self._response  = None
+    self._callbacks = {}
     self.set_media(media if media else DFPlayer.MEDIA_SD)
     # if not self.get_status():
     #   raise Exception('DFPlayer could not be initialized.')
     self.set_volume(volume)
     self.set_eq(eq if eq else DFPlayer.EQ_NORMAL)
 
+  # --- build frame   ---------------------------------------------------------
+
+  @staticmethod
+  def _checksum(buf):
+    # two's complement of the sum of version, length, command, feedback
+    # and data bytes
+    return -sum(buf[1:7]) & 0xFFFF
+
   # --- transfer data to device   ---------------------------------------------
 
-  def _write_data(self, cmd, dataL=0, dataH=0):
-    self._uart.write(b'\x7E')        # Start
-    self._uart.write(b'\xFF')        # Firmware version
-    self._uart.write(b'\x06')        # Command length
-    self._uart.write(bytes([cmd]))   # Command word
-    self._uart.write(b'\x00')        # Feedback flag
-    self._uart.write(bytes([dataH])) # DataH
-    self._uart.write(bytes([dataL])) # DataL
-    self._uart.write(b'\xEF')        # Stop
-
-    # give device some time
+  def _send(self, cmd, dataL=0, dataH=0):
+    buf = self._out_buf
+    buf[3] = cmd                     # Command word
+    buf[5] = dataH                   # DataH
+    buf[6] = dataL                   # DataL
+    checksum = DFPlayer._checksum(buf)
+    buf[7] = checksum >> 8           # Checksum
+    buf[8] = checksum & 0xFF
+    self._uart.write(buf)
+
+    # give device some time before the next command
     if cmd == 0x09:                        # set_media
-      time.sleep(0.200)
+      delay_ms = 200
     elif cmd == 0x0C:                      # reset
-      time.sleep(1.000)
+      delay_ms = 1000
     elif cmd in [0x47,0x48,0x49,0x4E]:     # query files
-      time.sleep(0.500)
+      delay_ms = 500
     else:
-      time.sleep(self._latency)            # other commands
-
-  # --- read data from device   ------------------------------------------------
-
-  def _read_data(self):
-    if self._uart.in_waiting:
-      buf = self._uart.read(10)
-      if buf is not None and \
-             len(buf) ==   10 and \
-             buf[0]   == 0x7E and \
-             buf[1]   == 0xFF and \
-             buf[2]   == 0x06 and \
-             buf[9]   == 0xEF:
-        cmd  = buf[3]
-        data = struct.unpack('>H', buf[5:7])[0]
-        return (cmd, data)
-      return None
-
-  # --- get response   ---------------------------------------------------------
-
-  def _read_response(self):
-    res = None
-    while True:
-      r = self._read_data()
-      if not r:
-        return res
-      res = r
+      delay_ms = self._latency_ms          # other commands
+    self._ready_at = ticks_add(ticks_ms(), delay_ms)
+
+  # --- queue command   --------------------------------------------------------
+
+  def _write_data(self, cmd, dataL=0, dataH=0):
+    if cmd in DFPlayer._COALESCED:
+      # only the last value of a setting matters
+      for i, queued in enumerate(self._queue):
+        if queued[0] == cmd:
+          self._queue[i] = (cmd, dataL, dataH)
+          return
+    elif cmd in DFPlayer._TRANSPORT:
+      # a newer play or stop makes a queued one stale
+      for i, queued in enumerate(self._queue):
+        if queued[0] in DFPlayer._TRANSPORT:
+          self._queue[i] = (cmd, dataL, dataH)
+          return
+    self._queue.append((cmd, dataL, dataH))
+
+  # --- handle feedback, send next queued command if the device is ready   ----
+
+  def update(self):
+    self.poll()
+    if self._queue and not ticks_less(ticks_ms(), self._ready_at):
+      self._send(*self._queue.pop(0))
+
+  # --- wait until the previous command had its time   ------------------------
+
+  def _wait_ready(self):
+    wait_ms = ticks_diff(self._ready_at, ticks_ms())
+    if wait_ms > 0:
+      time.sleep(wait_ms / 1000)
+
+  # --- send all queued commands (blocking)   ---------------------------------
+
+  def flush(self):
+    while self._queue:
+      self._wait_ready()
+      self.update()
+
+  # --- send query and wait for the answer (blocking)   -----------------------
+
+  def _query(self, cmd, dataL=0):
+    self.flush()
+    self._wait_ready()
+    self.poll()                            # drop stale answers
+    self._response = None
+    self._send(cmd, dataL)
+    while ticks_less(ticks_ms(), self._ready_at):
+      self.poll()
+      if self._response is not None and self._response[0] == cmd:
+        break
+      time.sleep(0.005)
+    else:
+      self.poll()
+    return self._response
+
+  # --- register event callback   ----------------------------------------------
+
+  def on_event(self, event, callback):
+    """ call callback(event, data) whenever the device reports event """
+    self._callbacks[event] = callback
+
+  # --- read data from device (non-blocking)   ---------------------------------
+
+  def poll(self):
+    while self._uart.in_waiting:
+      n = self._uart.readinto(self._rx_view[:min(self._uart.in_waiting, len(self._rx_buf))])
+      if not n:
+        return
+      for i in range(n):
+        self._feed(self._rx_buf[i])
+
+  def _feed(self, byte):
+    frame = self._in_buf
+    if self._in_pos == 0 and byte != 0x7E:
+      return                               # wait for start byte
+    frame[self._in_pos] = byte
+    self._in_pos += 1
+    if self._in_pos < 10:
+      return
+
+    self._in_pos = 0
+    if frame[1]   == 0xFF and \
+       frame[2]   == 0x06 and \
+       frame[9]   == 0xEF and \
+       (frame[7] << 8 | frame[8]) == DFPlayer._checksum(frame):
+      self._dispatch(frame[3], frame[5] << 8 | frame[6])
+      return
+
+    # resync on the next start byte inside the broken frame
+    for i in range(1, 10):
+      if frame[i] == 0x7E:
+        for j in range(i, 10):
+          self._feed(frame[j])
+        return
+
+  def _dispatch(self, cmd, data):
+    if cmd >= 0x42:                        # answer to a query
+      self._response = (cmd, data)
+    if cmd in self._callbacks:
+      self._callbacks[cmd](cmd, data)
 
   # --- play   -----------------------------------------------------------------
 
@@ -158,8 +265,7 @@ class DFPlayer(object):
   # --- read volume   ----------------------------------------------------------
 
   def get_volume(self):
-    self._write_data(0x43)
-    r = self._read_response()
+    r = self._query(0x43)
     return int(r[1] / 0x1E *100) if r and r[0] == 0x43 else 0
 
   # --- set equalizer   --------------------------------------------------------
@@ -172,8 +278,7 @@ class DFPlayer(object):
   # --- read equalizer   -------------------------------------------------------
 
   def get_eq(self):
-    self._write_data(0x44)
-    r = self._read_response()
+    r = self._query(0x44)
     return r[1] if r and r[0] == 0x44 else 0
 
   # --- loop current song   ----------------------------------------------------
@@ -208,30 +313,41 @@ class DFPlayer(object):
   # --- read busy state   ------------------------------------------------------
 
   def get_status(self):
-    self._write_data(0x42)
-    r = self._read_response()
+    r = self._query(0x42)
     return r[1] if r and r[0] == 0x42 else None
 
   # --- query number of files   ------------------------------------------------
 
   def num_files(self,folder=None,media=None):
     if folder is not None:
-      self._write_data(0x4E,folder)
-      r = self._read_response()
+      r = self._query(0x4E,folder)
       return r[1] if r and r[0] == 0x4E else 0
 
+    cmd = self._num_files_cmd(media)
+    if cmd is None:
+      return 0
+    r = self._query(cmd)
+    if r and r[0] == cmd:
+      return r[1]
+    else:
+      return 0
+
+  # --- query number of files without waiting   -------------------------------
+
+  def request_num_files(self,callback,media=None):
+    """ queue the query, callback(cmd, count) gets the answer from update() """
+    cmd = self._num_files_cmd(media)
+    if cmd is not None:
+      self.on_event(cmd, callback)
+      self._write_data(cmd)
+
+  def _num_files_cmd(self,media=None):
     if media is None:
       media = self._media
     if media == DFPlayer.MEDIA_U_DISK:
-      self._write_data(0x47)
+      return 0x47
     elif media == DFPlayer.MEDIA_SD:
-      self._write_data(0x48)
+      return 0x48
     elif media == DFPlayer.MEDIA_FLASH:
-      self._write_data(0x49)
-    else:
-      return 0
-    r = self._read_response()
-    if r and r[0] >= 0x47 and r[0] <= 0x49:
-      return r[1]
-    else:
-      return 0
+      return 0x49
+    return None
@@ -1,7 +1,8 @@
 from math import sqrt, log, exp
+from array import array
 
 
-__all__ = ("SH_converter", )
+__all__ = ("SH_converter", "ADC_lookup", )
 
 # todo: check all the docstrings
 
@@ -78,6 +79,15 @@ class SH_converter(object):
 
         return R
 
+    def adc_lookup(self, r_ref, v_ref=65535, shift=8):
+        """
+        Build an `ADC_lookup` for a voltage divider with the thermistor
+        on the low side and `r_ref` on the high side.
+
+        See `ADC_lookup`.
+        """
+        return ADC_lookup(self, r_ref, v_ref, shift)
+
     def _to_str_impl(self, compact=False, with_temps=True):
         """
         Stringify (kinda) implementation used by
@@ -129,3 +139,49 @@ class SH_converter(object):
         """
         s = self._to_str_impl(compact=True, with_temps=True)
         return f"SH_converter[{s}]"
+
+
+
+class ADC_lookup(object):
+    """
+    Convert raw ADC readings to temperature with a precomputed table.
+
+    The table holds the temperature, in tenths of a degree Celsius,
+    at every `2**shift`-th ADC value; readings in between are linearly
+    interpolated, so a conversion is an index and a multiply instead
+    of a `log` and a cube.
+    """
+    __slots__ = ("table", "shift", "mask", )
+
+    def __init__(self, converter, r_ref, v_ref=65535, shift=8):
+        """
+        Tabulate `converter` for a divider with reference resistor
+        `r_ref` read by an ADC whose full scale is `v_ref`.
+        """
+        self.shift = shift
+        self.mask = (1 << shift) - 1
+
+        size = (v_ref >> shift) + 2
+        self.table = array("h", [0] * size)
+        for i in range(size):
+            # both ends of the scale are infinite/zero resistance
+            v_in = min(max(i << shift, 1), v_ref - 1)
+            r_T = r_ref * (v_ref / v_in - 1)
+            T = round(converter.temperature(r_T) * 10)
+            self.table[i] = min(max(T, -32768), 32767)
+
+    def temperature_tenths(self, adc):
+        """
+        Calculate the temperature in tenths of a degree Celsius given
+        the raw ADC reading.
+        """
+        adc = int(adc)
+        i = adc >> self.shift
+        low, high = self.table[i], self.table[i + 1]
+        return low + (((high - low) * (adc & self.mask)) >> self.shift)
+
+    def temperature(self, adc):
+        """
+        Calculate the temperature (Celsius) given the raw ADC reading.
+        """
+        return self.temperature_tenths(adc) / 10
@@ -0,0 +1,159 @@
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_bitmap_font.atlas`
+====================================================
+
+Loads pre-rasterized glyph atlas fonts (``.bfa``) written by
+``tools/compile_font.py``.
+
+File layout, all little endian:
+
+* header: magic ``BFAT``, version, bounding box (width, height,
+  x_offset, y_offset), ascent, descent, glyph count
+* metrics table sorted by code point: code point, width, height,
+  dx, dy, shift_x, shift_y, offset of the glyph's bits
+* glyph bits: 1 bit per pixel, most significant bit first, every row
+  padded to a whole byte
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+
+try:
+    from typing import Union, Tuple, Iterable
+    from io import FileIO
+    from displayio import Bitmap
+except ImportError:
+    pass
+
+import gc
+import struct
+from fontio import Glyph
+from .glyph_cache import GlyphCache
+
+try:
+    from bitmaptools import readinto as _bitmap_readinto
+except ImportError:
+    _bitmap_readinto = None  # pylint: disable=invalid-name
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
+
+MAGIC = b"BFAT"
+VERSION = 1
+HEADER_FORMAT = "<4sBhhhhhhH"
+METRICS_FORMAT = "<IBBhhhhI"
+
+
+class Atlas(GlyphCache):
+    """Loads glyphs from a glyph atlas file in the given bitmap_class."""
+
+    def __init__(self, f: FileIO, bitmap_class: Bitmap) -> None:
+        super().__init__()
+        self.file = f
+        self.name = f
+        self.bitmap_class = bitmap_class
+        f.seek(0)
+        header = f.read(struct.calcsize(HEADER_FORMAT))
+        (
+            magic,
+            version,
+            width,
+            height,
+            x_offset,
+            y_offset,
+            self._ascent,
+            self._descent,
+            self._glyph_count,
+        ) = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported file version")
+        self._bounding_box = (width, height, x_offset, y_offset)
+        self._metrics_size = struct.calcsize(METRICS_FORMAT)
+        self._metrics = f.read(self._glyph_count * self._metrics_size)
+
+    @property
+    def ascent(self) -> int:
+        """The number of pixels above the baseline of a typical ascender"""
+        return self._ascent
+
+    @property
+    def descent(self) -> int:
+        """The number of pixels below the baseline of a typical descender"""
+        return self._descent
+
+    def get_bounding_box(self) -> Tuple[int, int, int, int]:
+        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        return self._bounding_box
+
+    def _find_metrics(self, code_point: int) -> Tuple:
+        """Binary search the metrics table, returns None if the glyph is missing"""
+        low = 0
+        high = self._glyph_count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            metrics = struct.unpack_from(
+                METRICS_FORMAT, self._metrics, middle * self._metrics_size
+            )
+            if metrics[0] < code_point:
+                low = middle + 1
+            elif metrics[0] > code_point:
+                high = middle - 1
+            else:
+                return metrics
+        return None
+
+    def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, str):
+            code_points = [ord(c) for c in code_points]
+
+        all_metrics = []
+        for code_point in code_points:
+            if self._glyphs.get(code_point, None) is not None:
+                continue
+            metrics = self._find_metrics(code_point)
+            if metrics is not None:
+                all_metrics.append(metrics)
+        if not all_metrics:
+            return
+
+        # read in file order
+        all_metrics.sort(key=lambda metrics: metrics[7])
+
+        gc.collect()
+        for code_point, width, height, dx, dy, shift_x, shift_y, offset in all_metrics:
+            bitmap = self.bitmap_class(width, height, 2)
+            self.file.seek(offset)
+            if _bitmap_readinto:
+                _bitmap_readinto(
+                    bitmap,
+                    self.file,
+                    bits_per_pixel=1,
+                    element_size=1,
+                    reverse_pixels_in_element=True,
+                )
+            else:
+                buf = bytearray((width + 7) // 8)
+                start = 0
+                for _ in range(height):
+                    self.file.readinto(buf)
+                    for k in range(width):
+                        if buf[k // 8] & (128 >> (k % 8)):
+                            bitmap[start + k] = 1
+                    start += width
+
+            self._add_glyph(
+                code_point,
+                Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y),
+            )
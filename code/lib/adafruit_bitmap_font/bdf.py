@@ -30,6 +30,8 @@ except ImportError:
     pass
 
 import gc
+import os
+import struct
 from fontio import Glyph
 from .glyph_cache import GlyphCache
 
@@ -38,9 +40,26 @@ __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
 
 class BDF(GlyphCache):
-    """Loads glyphs from a BDF file in the given bitmap_class."""
+    """Loads glyphs from a BDF file in the given bitmap_class.
 
-    def __init__(self, f: FileIO, bitmap_class: Bitmap) -> None:
+    The first glyph load scans the file once and records where every
+    glyph starts. If ``filename`` is given the offsets are saved next to
+    the font (``<filename>.idx``) and reused on later loads, so a glyph
+    load is a seek instead of a scan of the whole file.
+
+    A saved index is only used while the font has the same size, and
+    every glyph read through it must start with the expected ENCODING.
+    Otherwise the file is scanned again and the index rewritten.
+    """
+
+    _index_magic = b"BDFI"
+    # magic, font size, ascent, descent, point size, x/y resolution, count
+    _index_header = "<4sIhhHHHI"
+    _index_entry = "<II"
+
+    def __init__(
+        self, f: FileIO, bitmap_class: Bitmap, filename: Optional[str] = None
+    ) -> None:
         super().__init__()
         self.file = f
         self.name = f
@@ -55,38 +74,124 @@ class BDF(GlyphCache):
         self.y_resolution = None
         self._ascent = None
         self._descent = None
+        self._index = None
+        self._index_filename = None
+        self._font_size = 0
+        if filename is not None:
+            self._index_filename = filename + ".idx"
+            self._font_size = os.stat(filename)[6]
+            self._load_index()
 
     @property
     def descent(self) -> Optional[int]:
         """The number of pixels below the baseline of a typical descender"""
-        if self._descent is None:
-            self.file.seek(0)
-            while True:
-                line = self.file.readline()
-                if not line:
-                    break
-
-                if line.startswith(b"FONT_DESCENT "):
-                    self._descent = int(line.split()[1])
-                    break
-
+        self._build_index()
         return self._descent
 
     @property
     def ascent(self) -> Optional[int]:
         """The number of pixels above the baseline of a typical ascender"""
-        if self._ascent is None:
-            self.file.seek(0)
-            while True:
-                line = self._readline_file()
-                if not line:
-                    break
+        self._build_index()
+        return self._ascent
 
-                if line.startswith("FONT_ASCENT "):
-                    self._ascent = int(line.split()[1])
-                    break
+    def _load_index(self) -> None:
+        """Load the glyph offsets saved by a previous run, if they match the font"""
+        try:
+            with open(self._index_filename, "rb") as index_file:
+                data = index_file.read()
+        except OSError:
+            return
 
-        return self._ascent
+        header_size = struct.calcsize(self._index_header)
+        entry_size = struct.calcsize(self._index_entry)
+        if len(data) < header_size:
+            return
+        (
+            magic,
+            font_size,
+            ascent,
+            descent,
+            point_size,
+            x_resolution,
+            y_resolution,
+            count,
+        ) = struct.unpack_from(self._index_header, data)
+        if (
+            magic != self._index_magic
+            or font_size != self._font_size
+            or len(data) != header_size + count * entry_size
+        ):
+            return
+
+        index = {}
+        for i in range(count):
+            code_point, offset = struct.unpack_from(
+                self._index_entry, data, header_size + i * entry_size
+            )
+            index[code_point] = offset
+        self._ascent = ascent
+        self._descent = descent
+        self.point_size = point_size
+        self.x_resolution = x_resolution
+        self.y_resolution = y_resolution
+        self._index = index
+
+    def _save_index(self) -> None:
+        """Save the glyph offsets next to the font"""
+        try:
+            with open(self._index_filename, "wb") as index_file:
+                index_file.write(
+                    struct.pack(
+                        self._index_header,
+                        self._index_magic,
+                        self._font_size,
+                        self._ascent or 0,
+                        self._descent or 0,
+                        self.point_size or 0,
+                        self.x_resolution or 0,
+                        self.y_resolution or 0,
+                        len(self._index),
+                    )
+                )
+                for code_point, offset in self._index.items():
+                    index_file.write(struct.pack(self._index_entry, code_point, offset))
+        except OSError:
+            # read-only filesystem, the index stays in memory
+            pass
+
+    def _build_index(self) -> None:
+        """Scan the file once, recording the offset of every glyph"""
+        if self._index is not None:
+            return
+
+        index = {}
+        char_offset = 0
+        self.file.seek(0)
+        while True:
+            offset = self.file.tell()
+            line = self.file.readline()
+            if not line:
+                break
+            if line.startswith(b"STARTCHAR"):
+                char_offset = offset
+            elif line.startswith(b"ENCODING"):
+                code_point = int(line.split()[1])
+                # unencoded glyphs (ENCODING -1) can't be looked up
+                if code_point >= 0:
+                    index[code_point] = char_offset
+            elif line.startswith(b"SIZE"):
+                _, point_size, x_resolution, y_resolution = line.split()
+                self.point_size = int(point_size)
+                self.x_resolution = int(x_resolution)
+                self.y_resolution = int(y_resolution)
+            elif line.startswith(b"FONT_ASCENT "):
+                self._ascent = int(line.split()[1])
+            elif line.startswith(b"FONT_DESCENT "):
+                self._descent = int(line.split()[1])
+        self._index = index
+
+        if self._index_filename is not None:
+            self._save_index()
 
     def _verify_bounding_box(self) -> None:
         """Private function to verify FOUNTBOUNDINGBOX parameter
@@ -121,15 +226,6 @@ class BDF(GlyphCache):
         return self._boundingbox
 
     def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
-        # pylint: disable=too-many-statements,too-many-branches,too-many-nested-blocks,too-many-locals
-        metadata = True
-        character = False
-        code_point = None
-        bytes_per_row = 1
-        desired_character = False
-        current_info = {}
-        current_y = 0
-        rounded_x = 1
         if isinstance(code_points, int):
             remaining = set()
             remaining.add(code_points)
@@ -145,89 +241,92 @@ class BDF(GlyphCache):
         if not remaining:
             return
 
-        x, _, _, _ = self._boundingbox
+        self._build_index()
+        if not self._read_glyphs(remaining):
+            # the saved index doesn't match the font, scan it again
+            self._index = None
+            self._build_index()
+            self._read_glyphs(remaining)
 
-        self.file.seek(0)
+    def _read_glyphs(self, code_points: Iterable[int]) -> bool:
+        """Read the glyphs through the index, False if it was stale"""
+        offsets = []
+        for code_point in code_points:
+            offset = self._index.get(code_point)
+            if offset is not None:
+                offsets.append((offset, code_point))
+        # read in file order
+        offsets.sort()
+
+        gc.collect()
+        for offset, code_point in offsets:
+            if code_point in self._glyphs and self._glyphs[code_point]:
+                continue
+            self.file.seek(offset)
+            if not self._read_glyph(code_point):
+                return False
+        return True
+
+    def _read_glyph(self, code_point: int) -> bool:
+        """Read the glyph that starts at the current file position.
+
+        Returns False, adding nothing, if it isn't the glyph for ``code_point``.
+        """
+        if not self.file.readline().startswith(b"STARTCHAR"):
+            return False
+        bounds = None
+        shift = None
+        bitmap = None
+        in_bitmap = False
+        current_y = 0
+        rounded_x = 1
         while True:
             line = self.file.readline()
-            if not line:
+            if not line or line.startswith(b"ENDCHAR"):
                 break
-            if line.startswith(b"CHARS "):
-                metadata = False
-            elif line.startswith(b"SIZE"):
-                _, self.point_size, self.x_resolution, self.y_resolution = line.split()
-            elif line.startswith(b"COMMENT"):
-                pass
-            elif line.startswith(b"STARTCHAR"):
-                character = True
-            elif line.startswith(b"ENDCHAR"):
-                character = False
-                if desired_character:
-                    bounds = current_info["bounds"]
-                    shift = current_info["shift"]
-                    gc.collect()
-                    self._glyphs[code_point] = Glyph(
-                        current_info["bitmap"],
-                        0,
-                        bounds[0],
-                        bounds[1],
-                        bounds[2],
-                        bounds[3],
-                        shift[0],
-                        shift[1],
-                    )
-                    remaining.remove(code_point)
-                    if not remaining:
-                        return
-                desired_character = False
-            elif line.startswith(b"BBX"):
-                if desired_character:
-                    _, x, y, x_offset, y_offset = line.split()
-                    x = int(x)
-                    y = int(y)
-                    x_offset = int(x_offset)
-                    y_offset = int(y_offset)
-                    current_info["bounds"] = (x, y, x_offset, y_offset)
-                    current_info["bitmap"] = self.bitmap_class(x, y, 2)
-            elif line.startswith(b"BITMAP"):
-                if desired_character:
-                    rounded_x = x // 8
-                    if x % 8 > 0:
-                        rounded_x += 1
-                    bytes_per_row = rounded_x
-                    if bytes_per_row % 4 > 0:
-                        bytes_per_row += 4 - bytes_per_row % 4
-                    current_y = 0
+            if in_bitmap:
+                bits = int(line.strip(), 16)
+                width = bounds[0]
+                start = current_y * width
+                x = 0
+                for i in range(rounded_x):
+                    val = (bits >> ((rounded_x - i - 1) * 8)) & 0xFF
+                    for j in range(7, -1, -1):
+                        if x >= width:
+                            break
+                        bit = 0
+                        if val & (1 << j) != 0:
+                            bit = 1
+                        bitmap[start + x] = bit
+                        x += 1
+                current_y += 1
             elif line.startswith(b"ENCODING"):
-                _, code_point = line.split()
-                code_point = int(code_point)
-                if code_point in remaining:
-                    desired_character = True
-                    current_info = {"bitmap": None, "bounds": None, "shift": None}
+                if int(line.split()[1]) != code_point:
+                    return False
+            elif line.startswith(b"BBX"):
+                _, x, y, x_offset, y_offset = line.split()
+                bounds = (int(x), int(y), int(x_offset), int(y_offset))
+                bitmap = self.bitmap_class(bounds[0], bounds[1], 2)
             elif line.startswith(b"DWIDTH"):
-                if desired_character:
-                    _, shift_x, shift_y = line.split()
-                    shift_x = int(shift_x)
-                    shift_y = int(shift_y)
-                    current_info["shift"] = (shift_x, shift_y)
-            elif line.startswith(b"SWIDTH"):
-                pass
-            elif character:
-                if desired_character:
-                    bits = int(line.strip(), 16)
-                    width = current_info["bounds"][0]
-                    start = current_y * width
-                    x = 0
-                    for i in range(rounded_x):
-                        val = (bits >> ((rounded_x - i - 1) * 8)) & 0xFF
-                        for j in range(7, -1, -1):
-                            if x >= width:
-                                break
-                            bit = 0
-                            if val & (1 << j) != 0:
-                                bit = 1
-                            current_info["bitmap"][start + x] = bit
-                            x += 1
-                    current_y += 1
-            elif metadata:
-                pass
+                _, shift_x, shift_y = line.split()
+                shift = (int(shift_x), int(shift_y))
+            elif line.startswith(b"BITMAP"):
+                rounded_x = bounds[0] // 8
+                if bounds[0] % 8 > 0:
+                    rounded_x += 1
+                in_bitmap = True
+
+        self._add_glyph(
+            code_point,
+            Glyph(
+                bitmap,
+                0,
+                bounds[0],
+                bounds[1],
+                bounds[2],
+                bounds[3],
+                shift[0],
+                shift[1],
+            ),
+        )
+        return True
@@ -23,11 +23,12 @@ Implementation Notes
 """
 
 try:
-    from typing import Optional, Union
+    from typing import Optional, Union, Iterable
     from displayio import Bitmap
     from . import bdf
     from . import pcf
     from . import ttf
+    from . import atlas
 except ImportError:
     pass
 
@@ -36,9 +37,17 @@ __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
 
 def load_font(
-    filename: str, bitmap: Optional[Bitmap] = None
-) -> Union[bdf.BDF, pcf.PCF, ttf.TTF]:
-    """Loads a font file. Returns None if unsupported."""
+    filename: str,
+    bitmap: Optional[Bitmap] = None,
+    preload: Optional[Union[str, Iterable[int]]] = None,
+    memory_budget: Optional[int] = None,
+) -> Union[bdf.BDF, pcf.PCF, ttf.TTF, atlas.Atlas]:
+    """Loads a font file. Returns None if unsupported.
+
+    ``preload`` glyphs are loaded in one pass right away and stay cached,
+    other glyphs are evicted once they use more than ``memory_budget``
+    bytes, see `GlyphCache`.
+    """
     # pylint: disable=import-outside-toplevel, redefined-outer-name, consider-using-with
     if not bitmap:
         import displayio
@@ -46,17 +55,26 @@ def load_font(
         bitmap = displayio.Bitmap
     font_file = open(filename, "rb")
     first_four = font_file.read(4)
-    if filename.endswith("bdf") and first_four == b"STAR":
+    if filename.endswith("bfa") and first_four == b"BFAT":
+        from . import atlas
+
+        font = atlas.Atlas(font_file, bitmap)
+    elif filename.endswith("bdf") and first_four == b"STAR":
         from . import bdf
 
-        return bdf.BDF(font_file, bitmap)
-    if filename.endswith("pcf") and first_four == b"\x01fcp":
+        font = bdf.BDF(font_file, bitmap, filename)
+    elif filename.endswith("pcf") and first_four == b"\x01fcp":
         from . import pcf
 
-        return pcf.PCF(font_file, bitmap)
-    if filename.endswith("ttf") and first_four == b"\x00\x01\x00\x00":
+        font = pcf.PCF(font_file, bitmap)
+    elif filename.endswith("ttf") and first_four == b"\x00\x01\x00\x00":
         from . import ttf
 
         return ttf.TTF(font_file, bitmap)
+    else:
+        raise ValueError("Unknown magic number %r" % first_four)
 
-    raise ValueError("Unknown magic number %r" % first_four)
+    font.memory_budget = memory_budget
+    if preload is not None:
+        font.preload(preload)
+    return font
@@ -28,29 +28,94 @@ try:
 except ImportError:
     pass
 
-import gc
-
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
 
 class GlyphCache:
-    """Caches glyphs loaded by a subclass."""
+    """Caches glyphs loaded by a subclass.
+
+    Glyphs passed to `preload` stay cached for the lifetime of the font.
+    All other glyphs are evicted least recently used first once their
+    estimated size exceeds ``memory_budget`` bytes (``None``: unbounded).
+    """
 
     def __init__(self) -> None:
         self._glyphs = {}
+        self._pinned = set()
+        self._last_used = {}
+        self._use_count = 0
+        self._cache_bytes = 0
+        self.memory_budget = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
     def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
         """Loads displayio.Glyph objects into the GlyphCache from the font."""
 
+    def preload(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        """Loads the given glyphs in one pass and never evicts them."""
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, str):
+            code_points = [ord(c) for c in code_points]
+        code_points = list(code_points)
+
+        self._pinned.update(code_points)
+        for code_point in code_points:
+            if code_point in self._last_used:
+                # already cached, no longer counts against the budget
+                del self._last_used[code_point]
+                self._cache_bytes -= self._glyph_size(self._glyphs[code_point])
+        self.load_glyphs(code_points)
+        for code_point in code_points:
+            if code_point not in self._glyphs:
+                self._glyphs[code_point] = None
+
     def get_glyph(self, code_point: int) -> Glyph:
         """Returns a displayio.Glyph for the given code point or None is unsupported."""
+        self._use_count += 1
         if code_point in self._glyphs:
+            self.hits += 1
+            if code_point in self._last_used:
+                self._last_used[code_point] = self._use_count
             return self._glyphs[code_point]
 
-        code_points = set()
-        code_points.add(code_point)
         self._glyphs[code_point] = None
-        self.load_glyphs(code_points)
-        gc.collect()
+        self.load_glyphs(code_point)
         return self._glyphs[code_point]
+
+    def _add_glyph(self, code_point: int, glyph: Glyph) -> None:
+        """Called by subclasses for every glyph they load from the file."""
+        self.misses += 1
+        self._glyphs[code_point] = glyph
+        if code_point in self._pinned:
+            return
+
+        self._use_count += 1
+        self._last_used[code_point] = self._use_count
+        self._cache_bytes += self._glyph_size(glyph)
+        while (
+            self.memory_budget is not None
+            and self._cache_bytes > self.memory_budget
+            and len(self._last_used) > 1
+        ):
+            self._evict(code_point)
+
+    def _evict(self, keep: int) -> None:
+        oldest = None
+        for code_point, last_used in self._last_used.items():
+            if code_point != keep and (
+                oldest is None or last_used < self._last_used[oldest]
+            ):
+                oldest = code_point
+        self._cache_bytes -= self._glyph_size(self._glyphs[oldest])
+        del self._last_used[oldest]
+        del self._glyphs[oldest]
+        self.evictions += 1
+
+    @staticmethod
+    def _glyph_size(glyph: Glyph) -> int:
+        """Rough heap use of a glyph: 1 bpp rows padded to 32 bits plus objects"""
+        return ((glyph.width + 31) // 32) * 4 * glyph.height + 64
@@ -371,15 +371,18 @@ class PCF(GlyphCache):
                 width = metrics.right_side_bearing - metrics.left_side_bearing
                 height = metrics.character_ascent + metrics.character_descent
                 bitmap = bitmaps[i] = self.bitmap_class(width, height, 2)
-                self._glyphs[code_points[i]] = Glyph(
-                    bitmap,
-                    0,
-                    width,
-                    height,
-                    metrics.left_side_bearing,
-                    -metrics.character_descent,
-                    metrics.character_width,
-                    0,
+                self._add_glyph(
+                    code_points[i],
+                    Glyph(
+                        bitmap,
+                        0,
+                        width,
+                        height,
+                        metrics.left_side_bearing,
+                        -metrics.character_descent,
+                        metrics.character_width,
+                        0,
+                    ),
                 )
 
         for i, code_point in enumerate(code_points):
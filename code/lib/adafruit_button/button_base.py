@@ -47,6 +47,9 @@ class ButtonBase(Group):
     :param selected_label: Text that appears when selected
     """
 
+    # label font -> {character: advance width}
+    _font_advances = {}
+
     def __init__(
         self,
         *,
@@ -82,39 +85,69 @@ class ButtonBase(Group):
 
     @label.setter
     def label(self, newtext):
-        if self._label and self and (self[-1] == self._label):
-            self.pop()
-
-        self._label = None
         if not newtext or (self._label_color is None):  # no new text
+            if isinstance(self._label, Label) and self and (self[-1] == self._label):
+                self.pop()
+            self._label = None
             return  # nothing to do!
 
         if not self._label_font:
             raise RuntimeError("Please provide label font")
-        self._label = Label(self._label_font, text=newtext, scale=self._label_scale)
+        newtext = self._fit_label_text(newtext)
+        if isinstance(self._label, Label):
+            # reuse the label, no new bitmap, palette and group per keypress
+            if self._label.text != newtext:
+                self._label.text = newtext
+        else:
+            self._label = Label(self._label_font, text=newtext, scale=self._label_scale)
         dims = list(self._label.bounding_box)
         dims[2] *= self._label.scale
         dims[3] *= self._label.scale
-        if dims[2] >= self.width or dims[3] >= self.height:
-            while len(self._label.text) > 1 and (
-                dims[2] >= self.width or dims[3] >= self.height
-            ):
-                self._label.text = "{}.".format(self._label.text[:-2])
-                dims = list(self._label.bounding_box)
-                dims[2] *= self._label.scale
-                dims[3] *= self._label.scale
-            if len(self._label.text) <= 1:
-                raise RuntimeError("Button not large enough for label")
+        if dims[3] >= self.height:
+            raise RuntimeError("Button not large enough for label")
         self._label.x = (self.width - dims[2]) // 2
         self._label.y = self.height // 2
         self._label.color = (
             self._label_color if not self.selected else self._selected_label
         )
-        self.append(self._label)
+        if not (self and self[-1] == self._label):
+            self.append(self._label)
 
         if (self.selected_label is None) and (self._label_color is not None):
             self.selected_label = (~self._label_color) & 0xFFFFFF
 
+    def _advance(self, char):
+        """Width of a character in the label font, cached per font"""
+        advances = ButtonBase._font_advances.get(self._label_font)
+        if advances is None:
+            advances = ButtonBase._font_advances[self._label_font] = {}
+        advance = advances.get(char)
+        if advance is None:
+            glyph = self._label_font.get_glyph(ord(char))
+            advance = advances[char] = glyph.shift_x if glyph else 0
+        return advance
+
+    def _fit_label_text(self, text):
+        """Shorten text to "<longest prefix that fits>." if it is too wide"""
+        ends = [0]
+        for char in text:
+            ends.append(ends[-1] + self._advance(char) * self._label_scale)
+        if ends[-1] < self.width:
+            return text
+
+        # binary search the longest prefix that still fits with the dot
+        dot = self._advance(".") * self._label_scale
+        low, high = 0, len(text) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if ends[middle] + dot < self.width:
+                low = middle
+            else:
+                high = middle - 1
+        if low < 1:
+            raise RuntimeError("Button not large enough for label")
+        return "{}.".format(text[:low])
+
     def _subclass_selected_behavior(self, value):
         # Subclasses should overide this!
         pass
@@ -156,4 +189,5 @@ class ButtonBase(Group):
     @label_color.setter
     def label_color(self, new_color):
         self._label_color = _check_color(new_color)
-        self._label.color = self._label_color
+        if self._label is not None and not self.selected:
+            self._label.color = self._label_color
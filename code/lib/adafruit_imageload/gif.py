@@ -15,18 +15,26 @@ from a GIF file.
 """
 
 import struct
+from array import array
 
 try:
-    from typing import Tuple, Iterator, Optional, List
+    from typing import Tuple, Iterator, Optional
     from io import BufferedReader
     from displayio import Palette, Bitmap
     from .displayio_types import PaletteConstructor, BitmapConstructor
 except ImportError:
     pass
 
+try:
+    from bitmaptools import arrayblit as _arrayblit
+except ImportError:
+    _arrayblit = None  # pylint: disable=invalid-name
+
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
+_MAX_CODES = 4096
+
 
 def load(
     file: BufferedReader,
@@ -36,7 +44,9 @@ def load(
 ) -> Tuple[Bitmap, Optional[Palette]]:
     """Loads a GIF image from the open ``file``.
 
-    Returns tuple of bitmap object and palette object.
+    Returns tuple of bitmap object and palette object. Animated GIFs are
+    composed frame by frame into the bitmap, which ends up holding the
+    last frame.
 
     :param io.BufferedReader file: Open file handle or compatible (like `io.BytesIO`)
       with the data of a GIF file.
@@ -44,10 +54,51 @@ def load(
     :param object palette: Type to store the palette. Must have API similar to
       `displayio.Palette`. Will be skipped if None.
     """
+    bitmap_obj, palette_obj, background = _read_header(file, bitmap, palette)
+    for _ in _read_frames(file, bitmap_obj, background):
+        pass
+    return bitmap_obj, palette_obj
+
+
+def iter_frames(
+    file: BufferedReader,
+    *,
+    bitmap: BitmapConstructor,
+    palette: Optional[PaletteConstructor] = None
+) -> Iterator[
+    Tuple[Bitmap, Optional[Palette], Tuple[int, int, int, int], int, int]
+]:
+    """Decodes the frames of a GIF image from the open ``file`` one at a time.
+
+    Yields a tuple of bitmap object, palette object, the ``(x, y, width,
+    height)`` region that changed since the previous frame, its delay in
+    milliseconds and its disposal method. Every frame is drawn into the
+    same bitmap, and a frame is only decoded once the previous one has
+    been consumed. The disposal method of a frame is applied before the
+    next one is drawn, so the next region also covers what disposal
+    restored. Transparent pixels leave the bitmap as it was.
+
+    :param io.BufferedReader file: Open file handle or compatible (like `io.BytesIO`)
+      with the data of a GIF file. It must stay open while iterating.
+    :param object bitmap: Type to store bitmap data. Must have API similar to `displayio.Bitmap`.
+    :param object palette: Type to store the palette. Must have API similar to
+      `displayio.Palette`. Will be skipped if None.
+    """
+    bitmap_obj, palette_obj, background = _read_header(file, bitmap, palette)
+    for region, delay, disposal in _read_frames(file, bitmap_obj, background):
+        yield bitmap_obj, palette_obj, region, delay, disposal
+
+
+def _read_header(
+    file: BufferedReader,
+    bitmap: BitmapConstructor,
+    palette: Optional[PaletteConstructor],
+) -> Tuple[Bitmap, Optional[Palette], int]:
+    """Read the header and global palette, and create the bitmap."""
     header = file.read(6)
     if header not in {b"GIF87a", b"GIF89a"}:
         raise ValueError("Not a GIF file")
-    width, height, flags, _, _ = struct.unpack(  # pylint: disable=no-member
+    width, height, flags, background, _ = struct.unpack(  # pylint: disable=no-member
         "<HHBBB", file.read(7)
     )
     if (flags & 0x80) != 0:
@@ -61,117 +112,273 @@ def load(
         palette_obj = None
     color_bits = ((flags & 0x70) >> 4) + 1
     bitmap_obj = bitmap(width, height, (1 << color_bits) - 1)
+    return bitmap_obj, palette_obj, background
+
+
+def _read_frames(
+    file: BufferedReader, bitmap: Bitmap, background: int
+) -> Iterator[Tuple[Tuple[int, int, int, int], int, int]]:
+    """Draw the frames into the bitmap, yielding region, delay and disposal."""
+    delay = 0
+    disposal = 0
+    transparent_index = None
+    pending_disposal = None
+    # shared by all frames, no frame is larger than the image
+    pixels = bytearray(bitmap.width * bitmap.height)
+    tables = _lzw_tables()
     while True:
         block_type = file.read(1)[0]
         if block_type == 0x2C:  # frame
-            _read_frame(file, bitmap_obj)
+            disposed = None
+            if pending_disposal is not None:
+                disposed = _dispose(bitmap, background, *pending_disposal)
+            region, flags = _read_descriptor(file)
+            saved = _copy_region(bitmap, region) if disposal == 3 else None
+            _read_frame(file, bitmap, region, flags, pixels, tables, transparent_index)
+            yield _union(region, disposed), delay, disposal
+            pending_disposal = (region, disposal, saved)
+            # a graphic control extension only applies to the next frame
+            delay = 0
+            disposal = 0
+            transparent_index = None
         elif block_type == 0x21:  # extension
-            _ = file.read(1)[0]
-            # 0x01 = label, 0xfe = comment
-            _ = bytes(_read_blockstream(file))
+            label = file.read(1)[0]
+            if label == 0xF9:  # graphic control
+                for block in _read_blockstream(file):
+                    if len(block) >= 4:
+                        flags, delay, index = struct.unpack_from(  # pylint: disable=no-member
+                            "<BHB", block
+                        )
+                        delay *= 10
+                        disposal = (flags >> 2) & 0x07
+                        transparent_index = index if flags & 0x01 else None
+            else:
+                # 0x01 = label, 0xfe = comment, 0xff = application
+                for _ in _read_blockstream(file):
+                    pass
         elif block_type == 0x3B:  # terminator
             break
         else:
             raise ValueError("Bad block type")
-    return bitmap_obj, palette_obj
 
 
-def _read_frame(file: BufferedReader, bitmap: Bitmap) -> None:
-    """Read a single frame and apply it to the bitmap."""
-    ddx, ddy, width, _, flags = struct.unpack(  # pylint: disable=no-member
+def _read_descriptor(file: BufferedReader) -> Tuple[Tuple[int, int, int, int], int]:
+    """Read an image descriptor, skipping its local palette."""
+    ddx, ddy, width, height, flags = struct.unpack(  # pylint: disable=no-member
         "<HHHHB", file.read(9)
     )
-    if (flags & 0x40) != 0:
-        raise NotImplementedError("Interlacing not supported")
     if (flags & 0x80) != 0:
         palette_size = 1 << ((flags & 0x07) + 1)
         for _ in range(palette_size):
             _ = file.read(3)
+    return (ddx, ddy, width, height), flags
+
+
+def _read_frame(
+    file: BufferedReader,
+    bitmap: Bitmap,
+    region: Tuple[int, int, int, int],
+    flags: int,
+    pixels: bytearray,
+    tables: Tuple[array, array],
+    transparent_index: Optional[int] = None,
+) -> None:
+    """Read a single frame and apply it to the bitmap.
+
+    ``pixels`` and ``tables`` are reused from frame to frame.
+    """
+    if (flags & 0x40) != 0:
+        raise NotImplementedError("Interlacing not supported")
+    ddx, ddy, width, height = region
     min_code_size = file.read(1)[0]
-    x = 0
-    y = 0
-    for decoded in lzw_decode(_read_blockstream(file), min_code_size):
-        for byte in decoded:
-            bitmap[ddx + x, ddy + y] = byte
-            x += 1
-            if x >= width:
-                x = 0
-                y += 1
-
-
-def _read_blockstream(file: BufferedReader) -> Iterator[int]:
-    """Read a block from a file."""
+    if width * height > len(pixels):
+        raise ValueError("Frame larger than image")
+    count = lzw_decode(
+        _read_blockstream(file),
+        min_code_size,
+        memoryview(pixels)[: width * height],
+        tables,
+    )
+    _write_pixels(bitmap, pixels, count, ddx, ddy, width, transparent_index)
+
+
+def _write_pixels(
+    bitmap: Bitmap,
+    pixels: bytearray,
+    count: int,
+    x: int,
+    y: int,
+    width: int,
+    skip_index: Optional[int] = None,
+) -> None:
+    """Copy the first ``count`` pixel values of a frame into the bitmap,
+    leaving those equal to ``skip_index`` untouched."""
+    rows = count // width
+    start = 0
+    if _arrayblit is not None and rows:
+        _arrayblit(
+            bitmap,
+            memoryview(pixels)[: rows * width],
+            x,
+            y,
+            x + width,
+            y + rows,
+            skip_index,
+        )
+        start = rows * width
+    for i in range(start, count):
+        if pixels[i] != skip_index:
+            bitmap[x + i % width, y + i // width] = pixels[i]
+
+
+def _copy_region(bitmap: Bitmap, region: Tuple[int, int, int, int]) -> bytearray:
+    """Save the pixel values of a region of the bitmap."""
+    x, y, width, height = region
+    saved = bytearray(width * height)
+    i = 0
+    for row in range(y, y + height):
+        for column in range(x, x + width):
+            saved[i] = bitmap[column, row]
+            i += 1
+    return saved
+
+
+def _dispose(
+    bitmap: Bitmap,
+    background: int,
+    region: Tuple[int, int, int, int],
+    disposal: int,
+    saved: Optional[bytearray],
+) -> Optional[Tuple[int, int, int, int]]:
+    """Apply the disposal method of a frame once it has been shown.
+
+    Returns the region it changed, or None.
+    """
+    x, y, width, height = region
+    if disposal == 2:  # restore to background
+        pixels = bytearray([background]) * (width * height)
+        _write_pixels(bitmap, pixels, len(pixels), x, y, width)
+        return region
+    if disposal == 3 and saved is not None:  # restore to previous
+        _write_pixels(bitmap, saved, len(saved), x, y, width)
+        return region
+    return None
+
+
+def _union(
+    region: Tuple[int, int, int, int], other: Optional[Tuple[int, int, int, int]]
+) -> Tuple[int, int, int, int]:
+    """Smallest region covering both regions."""
+    if other is None:
+        return region
+    x = min(region[0], other[0])
+    y = min(region[1], other[1])
+    right = max(region[0] + region[2], other[0] + other[2])
+    bottom = max(region[1] + region[3], other[1] + other[3])
+    return x, y, right - x, bottom - y
+
+
+def _read_blockstream(file: BufferedReader) -> Iterator[memoryview]:
+    """Read the sub-blocks of a block, reusing one buffer for all of them.
+
+    Each yielded chunk is only valid until the next one is read.
+    """
+    buffer = memoryview(bytearray(255))
     while True:
         size = file.read(1)[0]
         if size == 0:
             break
-        for _ in range(size):
-            yield file.read(1)[0]
-
-
-class EndOfData(Exception):
-    """Signified end of compressed data."""
-
-
-class LZWDict:
-    """A dictionary of LZW codes."""
-
-    def __init__(self, code_size: int) -> None:
-        self.code_size = code_size
-        self.clear_code = 1 << code_size
-        self.end_code = self.clear_code + 1
-        self.codes = []  # type: List[bytes]
-        self.last = b""
-        self.clear()
-
-    def clear(self) -> None:
-        """Reset the dictionary to default codes."""
-        self.last = b""
-        self.code_len = self.code_size + 1
-        self.codes[:] = []
-
-    def decode(self, code: int) -> bytes:
-        """Decode a code."""
-        if code == self.clear_code:
-            self.clear()
-            return b""
-        if code == self.end_code:
-            raise EndOfData()
-        if code < self.clear_code:
-            value = bytes([code])
-        elif code <= len(self.codes) + self.end_code:
-            value = self.codes[code - self.end_code - 1]
-        else:
-            value = self.last + self.last[0:1]
-        if self.last:
-            self.codes.append(self.last + value[0:1])
-        if (
-            len(self.codes) + self.end_code + 1 >= 1 << self.code_len
-            and self.code_len < 12
-        ):
-            self.code_len += 1
-        self.last = value
-        return value
-
-
-def lzw_decode(data: Iterator[int], code_size: int) -> Iterator[bytes]:
-    """Decode LZW-compressed data."""
-    dictionary = LZWDict(code_size)
-    bit = 0
-    try:
-        byte = next(data)  # pylint: disable=stop-iteration-return
-        try:
-            while True:
-                code = 0
-                for i in range(dictionary.code_len):
-                    code |= ((byte >> bit) & 0x01) << i
-                    bit += 1
-                    if bit >= 8:
-                        bit = 0
-                        byte = next(data)  # pylint: disable=stop-iteration-return
-                yield dictionary.decode(code)
-        except EndOfData:
-            while True:
-                next(data)  # pylint: disable=stop-iteration-return
-    except StopIteration:
-        pass
+        chunk = buffer[:size]
+        file.readinto(chunk)
+        yield chunk
+
+
+def _lzw_tables() -> Tuple[array, array]:
+    """Allocate the start and length tables used by `lzw_decode`."""
+    return array("I", bytes(4 * _MAX_CODES)), array("H", bytes(2 * _MAX_CODES))
+
+
+def lzw_decode(
+    data: Iterator[memoryview],
+    code_size: int,
+    out: memoryview,
+    tables: Optional[Tuple[array, array]] = None,
+) -> int:
+    """Decode LZW-compressed data into ``out``, returning the decoded length.
+
+    ``data`` yields the compressed bytes in chunks. Codes are pulled from
+    a bit accumulator. Every string in the code table is the previous
+    string plus one character, so it already sits in ``out``: the table
+    only keeps its start and length, and decoding a code is one slice
+    copy. Data that doesn't fit in ``out`` is dropped. Pass ``tables``
+    from `_lzw_tables` to reuse them across frames.
+    """
+    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+    clear_code = 1 << code_size
+    end_code = clear_code + 1
+    starts, lengths = tables if tables is not None else _lzw_tables()
+    out_len = len(out)
+
+    next_code = end_code + 1
+    code_len = code_size + 1
+    code_mask = (1 << code_len) - 1
+    prev_start = -1
+    prev_len = 0
+    pos = 0
+    bits = 0
+    bit_count = 0
+    for chunk in data:
+        for byte in chunk:
+            bits |= byte << bit_count
+            bit_count += 8
+            while bit_count >= code_len:
+                code = bits & code_mask
+                bits >>= code_len
+                bit_count -= code_len
+
+                if code == clear_code:
+                    next_code = end_code + 1
+                    code_len = code_size + 1
+                    code_mask = (1 << code_len) - 1
+                    prev_start = -1
+                    continue
+                if code == end_code or pos >= out_len:
+                    # skip the rest of the stream
+                    for _ in data:
+                        pass
+                    return pos
+
+                if code < clear_code:
+                    out[pos] = code
+                    string_len = 1
+                elif code < next_code:
+                    string_len = lengths[code]
+                    if pos + string_len > out_len:
+                        string_len = out_len - pos
+                    start = starts[code]
+                    out[pos : pos + string_len] = out[start : start + string_len]
+                elif prev_start >= 0:
+                    # not in the table yet: the previous string followed
+                    # by its own first character
+                    string_len = prev_len + 1
+                    if pos + string_len > out_len:
+                        string_len = out_len - pos
+                    out[pos : pos + string_len - 1] = out[
+                        prev_start : prev_start + string_len - 1
+                    ]
+                    out[pos + string_len - 1] = out[prev_start]
+                else:
+                    raise ValueError("Bad LZW code")
+
+                if prev_start >= 0 and next_code < _MAX_CODES:
+                    starts[next_code] = prev_start
+                    lengths[next_code] = prev_len + 1
+                    next_code += 1
+                    if next_code > code_mask and code_len < 12:
+                        code_len += 1
+                        code_mask = (1 << code_len) - 1
+
+                prev_start = pos
+                prev_len = string_len
+                pos += string_len
+    return pos
@@ -0,0 +1,21 @@
+import displayio
+from adafruit_bitmap_font import bitmap_font
+
+# (file name, bitmap class) -> font, shared by every screen
+_fonts = {}
+
+
+def get_font(file_name, bitmap_class=displayio.Bitmap, preload=None):
+    """
+    Return the font for `file_name`, loading it on first use only.
+    Later callers get the same object, glyph cache included; their
+    `preload` characters are added to the cache.
+    """
+    key = (file_name, bitmap_class)
+    font = _fonts.get(key)
+    if font is None:
+        font = bitmap_font.load_font(file_name, bitmap_class, preload=preload)
+        _fonts[key] = font
+    elif preload is not None:
+        font.preload(preload)
+    return font
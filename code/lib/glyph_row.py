@@ -0,0 +1,89 @@
+import displayio
+
+
+class GlyphRow(displayio.Group):
+    """
+    A single line of text drawn as one fixed slot per character.
+
+    Unlike `label.Label`, setting `text` only swaps the tiles of the
+    characters that changed; the rest of the row, and the display area
+    it covers, is left alone. The row is anchored horizontally at `x`
+    (0.0 left, 0.5 center, 1.0 right) and sits on the `baseline`.
+    """
+
+    def __init__(self, font, color, x, baseline, anchor=0.5):
+        super().__init__()
+        self._font = font
+        self._palette = displayio.Palette(2)
+        self._palette.make_transparent(0)
+        self._palette[1] = color
+        self._anchor_x = x
+        self._anchor = anchor
+        self._baseline = baseline
+        self._text = ""
+        self._slots = []
+        self._slot_chars = []
+        # per slot: char -> TileGrid, so a blinking colon doesn't allocate
+        self._slot_tiles = []
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        if text == self._text:
+            return
+
+        glyphs = [self._font.get_glyph(ord(char)) for char in text]
+        width = 0
+        for glyph in glyphs:
+            if glyph is not None:
+                width += glyph.shift_x
+        x = self._anchor_x - int(width * self._anchor)
+
+        while len(self._slots) < len(text):
+            slot = displayio.Group()
+            self._slots.append(slot)
+            self._slot_chars.append(None)
+            self._slot_tiles.append({})
+            self.append(slot)
+
+        for i, char in enumerate(text):
+            slot = self._slots[i]
+            if self._slot_chars[i] != char:
+                self._set_slot_char(i, char, glyphs[i])
+            if slot.x != x:
+                slot.x = x
+            if slot.hidden:
+                slot.hidden = False
+            if glyphs[i] is not None:
+                x += glyphs[i].shift_x
+
+        for i in range(len(text), len(self._slots)):
+            if not self._slots[i].hidden:
+                self._slots[i].hidden = True
+
+        self._text = text
+
+    def _set_slot_char(self, index, char, glyph):
+        slot = self._slots[index]
+        if len(slot):
+            slot.pop()
+        self._slot_chars[index] = char
+        if glyph is None:
+            return
+
+        tiles = self._slot_tiles[index]
+        tile = tiles.get(char)
+        if tile is None:
+            tile = displayio.TileGrid(
+                glyph.bitmap,
+                pixel_shader=self._palette,
+                default_tile=glyph.tile_index,
+                tile_width=glyph.width,
+                tile_height=glyph.height,
+                x=glyph.dx,
+                y=self._baseline - glyph.height - glyph.dy)
+            tiles[char] = tile
+        slot.append(tile)
@@ -12,6 +12,10 @@ import digitalio
 from adafruit_debouncer import Debouncer
 import os
 import struct
+import array
+import binascii
+import gifio
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
 
 class DisplayHelper:
     def __init__(self):
@@ -39,6 +43,13 @@ class DisplayHelper:
                 height=settings.display_height,
                 colstart=settings.display_colstart,
                 rowstart=settings.display_rowstart, )
+        # the ScreenManager refreshes only when a screen changed
+        self.display.auto_refresh = False
+
+    def refresh(self):
+        # no target rate: refresh() skips the frame when the previous call
+        # was more than a frame ago, which is always the case here
+        return self.display.refresh(target_frames_per_second=None)
 
     def set_brightness(self, brightness_percent):
         self.backlight.duty_cycle = int(65535 / 100 * brightness_percent)
@@ -58,22 +69,30 @@ class DisplayHelper:
         return self.curr_brightness
 
     def get_brightness_setting(self):
-        curr_settings = settings.read_persistent_settings()
-        return curr_settings["display_brightness_percent"]
+        return settings.store["display_brightness_percent"]
 
     def save_setting(self):
-        curr_settings = settings.read_persistent_settings()
-        curr_settings["display_brightness_percent"] = self.curr_brightness
-        settings.save_persistent_settings(curr_settings)
+        settings.store["display_brightness_percent"] = self.curr_brightness
 
 
 class DFPlayerHelper:
+    _finish_repeat_ms = 500
+
     def __init__(self):
         uart = UART(settings.dfplayer_tx_pin, settings.dfplayer_rx_pin, baudrate=settings.dfplayer_baudrate)
         self.curr_volume = self.get_volume_setting()
         volume = self.abs_volume(self.curr_volume)
         self.player = DFPlayer(uart, volume=volume, latency=0.1)
-        self._ui_beep_index = self.player.num_files()
+        # the UI beep is the last track; the count is cached and checked
+        # against the module by refresh_inventory() once the UI is up
+        self._ui_beep_index = settings.store["track_count"]
+        self._ui_beep_pending = False
+        self.playing_track = None
+        self._track_finished_callback = None
+        self._last_finished_track = None
+        self._last_finished_at = 0
+        self.player.on_event(DFPlayer.EVENT_TRACK_FINISHED, self._on_track_finished)
+        self.player.on_event(DFPlayer.EVENT_CARD_INSERTED, self.refresh_inventory)
 
     def louder(self):
         if self.curr_volume < 100:
@@ -93,18 +112,62 @@ class DFPlayerHelper:
         return settings.dfplayer_max_volume / 100 * volume_percent
 
     def play_track(self, track):
+        self._ui_beep_pending = False
+        self.playing_track = track
         self.player.play(track=track)
 
+    def stop(self):
+        self._ui_beep_pending = False
+        self.playing_track = None
+        self.player.stop()
+
+    def on_track_finished(self, callback):
+        self._track_finished_callback = callback
+
+    def _on_track_finished(self, event, track):
+        # the module reports the end of a track twice in a row; the
+        # callback may already have started the same track again
+        now = ticks_ms()
+        if (track == self._last_finished_track
+                and ticks_diff(now, self._last_finished_at) < self._finish_repeat_ms):
+            return
+        self._last_finished_track = track
+        self._last_finished_at = now
+        self.playing_track = None
+        if self._track_finished_callback is not None:
+            self._track_finished_callback(track)
+
+    def refresh_inventory(self, event=None, data=None):
+        self.player.request_num_files(self._on_num_files)
+
+    def _on_num_files(self, cmd, track_count):
+        if track_count == 0:
+            return
+        self._ui_beep_index = track_count
+        settings.store["track_count"] = track_count
+
+        # every track but the UI beep is a selectable sound
+        sounds = settings.store["sounds"][:track_count - 1]
+        for track in range(len(sounds) + 1, track_count):
+            sounds.append("Track {}".format(track))
+        settings.store["sounds"] = sounds
+
     def play_ui_beep(self):
-        self.play_track(self._ui_beep_index)
+        # deferred to update() so the screen change is shown first
+        self._ui_beep_pending = True
+
+    def update(self):
+        if self._ui_beep_pending:
+            self._ui_beep_pending = False
+            if self._ui_beep_index:
+                self.play_track(self._ui_beep_index)
+        self.player.update()
 
     def get_volume_setting(self):
-        return settings.read_persistent_settings()["dfplayer_volume"]
+        return settings.store["dfplayer_volume"]
 
     def save_volume_setting(self):
-        curr_settings = settings.read_persistent_settings()
-        curr_settings["dfplayer_volume"] = self.curr_volume
-        settings.save_persistent_settings(curr_settings)
+        settings.store["dfplayer_volume"] = self.curr_volume
 
 
 class TimeHelper:
@@ -126,24 +189,59 @@ class TimeHelper:
 
 
 class TempHelper:
+    """
+    Samples the thermistor one ADC reading at a time into a ring buffer.
+
+    `sample` is meant to be called every `sample_period_ms` by the
+    scheduler; `getTemp` converts the running mean of the last
+    `temp_sample_window` readings and never waits for the ADC.
+    """
+    _r_ref = 10030
+
     def __init__(self):
-        curr_settings = settings.read_persistent_settings()
-        points = curr_settings["temp_calibration_readings"]
+        points = settings.store["temp_calibration_readings"]
         self.pin = analogio.AnalogIn(settings.temp_pin)
         self.converter = SH_converter.from_points(points)
+        self._lookup = self.converter.adc_lookup(self._r_ref)
+        self.sample_period_ms = settings.store["temp_sample_period_ms"]
+
+        window = settings.store["temp_sample_window"]
+        first_value = self.pin.value
+        self._samples = array.array("H", [first_value] * window)
+        self._next_sample = 0
+        self._sum = first_value * window
+        self._sum_sq = first_value * first_value * window
+        self._temp = None
+
+    def _to_temp(self, v_in):
+        return self._lookup.temperature(v_in)
+
+    def sample(self):
+        value = self.pin.value
+        old_value = self._samples[self._next_sample]
+        self._samples[self._next_sample] = value
+        self._sum += value - old_value
+        self._sum_sq += value * value - old_value * old_value
+        self._next_sample = (self._next_sample + 1) % len(self._samples)
+        self._temp = None
 
     def getTemp(self):
-        Sum = 0
-        sample_size = 10
-        for i in range(sample_size):
-            Sum += self.pin.value
-            time.sleep(0.05)
-        r_ref = 10030
-        v_ref = 65535
-        v_in = Sum / sample_size
-        r_T = r_ref * (v_ref / v_in - 1)
-
-        return self.converter.temperature(r_T)
+        if self._temp is None:
+            self._temp = self._to_temp(self._sum / len(self._samples))
+        return self._temp
+
+    def get_stats(self):
+        window = len(self._samples)
+        mean = self._sum / window
+        low_temp = self._to_temp(min(self._samples))
+        high_temp = self._to_temp(max(self._samples))
+        return {
+            "window": window,
+            "adc_mean": mean,
+            "adc_variance": self._sum_sq / window - mean * mean,
+            "min_temp": min(low_temp, high_temp),
+            "max_temp": max(low_temp, high_temp)
+        }
 
 
 class ButtonHelper:
@@ -167,44 +265,285 @@ class ButtonHelper:
 
 
 class GifHelper:
+    """
+    Plays a gif straight to the display bus, bypassing displayio.
+
+    Each frame is decoded ahead of its deadline so the wait hides the
+    decode time. Frame times follow the gif's own delays on a fixed
+    timeline, and a frame whose slot has already passed is decoded but
+    not pushed, so playback catches up instead of drifting.
+
+    Only the rows that changed since the last pushed frame are sent.
+    They are found by comparing a CRC of every row, and sent straight
+    from the bitmap's buffer.
+
+    The first playback of a short gif also records the pushed rows and
+    delays to a `.frames` sidecar. Later playbacks stream the sidecar to
+    the bus and skip the gif decoder entirely. A gif too big for the free
+    space gets a header-only sidecar, so it isn't tried again.
+    """
     _gif_folder = "gif"
+    _gif_suffix = ".gif"
+    _cache_suffix = ".frames"
+    _cache_magic = b"GIFR"
+    # magic, size of the gif it was made from, width, height, row pitch
+    # in pixels, frame count
+    _cache_header = "<4sIHHHH"
+    # delay in ms, first row, row count; followed by the rows
+    _cache_frame = "<IHH"
+    # header-only sidecar for a gif that is too big to record
+    _no_cache_magic = b"GIFX"
+    # only short gifs are recorded, and never into the last free space
+    _cache_max_bytes = 256 * 1024
+    _cache_reserve_bytes = 64 * 1024
+
+    def __init__(self):
+        self._stats = None
+        self._row_crcs = None
 
     def get_gif_paths(self):
-        return [self._gif_folder + "/" + gif for gif in os.listdir(self._gif_folder)]
+        return [self._gif_folder + "/" + gif for gif in self._gif_files()]
 
     def get_gif_names(self):
-        return [gif.split('.')[0] for gif in os.listdir(self._gif_folder)]
+        return [gif.split('.')[0] for gif in self._gif_files()]
+
+    def _gif_files(self):
+        return [gif for gif in os.listdir(self._gif_folder) if gif.endswith(self._gif_suffix)]
 
     def get_intro_gif_index(self):
-        intro_gif_file = settings.read_persistent_settings()["gif_file"]
+        intro_gif_file = settings.store["gif_file"]
         return self.get_gif_paths().index(intro_gif_file)
 
-    def play_gif(self, odg):
-        stngs = settings.read_persistent_settings()
-
-        display = display_helper.display
-
-        display_helper.set_brightness(stngs["display_brightness_percent"])
-        start = time.monotonic()
-        next_delay = odg.next_frame()  # Load the first frame
-        end = time.monotonic()
-        overhead = end - start
-        #
-        display.auto_refresh = False
-        display_bus = display.bus
-        #
-        # Display repeatedly & directly.
-        for f in range(odg.frame_count):
-            # Sleep for the frame delay specified by the GIF,
-            # minus the overhead measured to advance between frames.
-            time.sleep(max(0, next_delay - overhead))
-            next_delay = odg.next_frame()
-
-            display_bus.send(42, struct.pack(">hh", 0, odg.bitmap.width - 1))
-            display_bus.send(43, struct.pack(">hh", 0, odg.bitmap.height - 1))
-            display_bus.send(44, odg.bitmap)
-
-        display.auto_refresh = True
+    def play(self, gif_file):
+        display_helper.set_brightness(settings.store["display_brightness_percent"])
+        cache_file = gif_file + self._cache_suffix
+        magic = self._cache_kind(gif_file, cache_file)
+        if magic == self._cache_magic and self._play_cache(gif_file, cache_file):
+            return
+
+        odg = gifio.OnDiskGif(gif_file)
+        if magic == self._no_cache_magic:
+            cache_file = None
+        elif not self._cache_fits(odg):
+            # remember the answer instead of failing to record on every boot
+            self._mark_no_cache(cache_file)
+            cache_file = None
+        self.play_gif(odg, cache_file)
+
+    def play_gif(self, odg, cache_file=None):
+        display_bus = display_helper.display.bus
+        bitmap = odg.bitmap
+        buffer = memoryview(bitmap)
+        width = bitmap.width
+        height = bitmap.height
+        # displayio pads rows to 32 bits; the window takes the padding
+        # pixel as an extra column so rows go out without a copy
+        stride = len(buffer) // height
+        frame_count = odg.frame_count
+        cache = self._open_cache(cache_file, width, height, stride, frame_count)
+
+        shown = 0
+        dropped = 0
+        late_sum = 0
+        late_max = 0
+        bytes_sent = 0
+        self._row_crcs = None
+        start = ticks_ms()
+        deadline = start
+        for f in range(frame_count):
+            delay_ms = int(odg.next_frame() * 1000)
+            late = self._wait_until(deadline)
+
+            if late >= delay_ms and f < frame_count - 1 and cache is None:
+                # the next frame is already due, skip the push
+                dropped += 1
+            else:
+                first, last = self._changed_rows(buffer, height, stride)
+                rows = buffer[first * stride:(last + 1) * stride]
+                if first <= last:
+                    self._push_rows(display_bus, rows, stride, first, last)
+                if cache is not None:
+                    cache = self._write_cache_frame(cache, cache_file, delay_ms, first, last, rows)
+                shown += 1
+                late_sum += late
+                late_max = max(late_max, late)
+                bytes_sent += max(0, last + 1 - first) * stride * 2
+
+            deadline = ticks_add(deadline, delay_ms)
+
+        if cache is not None:
+            self._close_cache(cache, cache_file)
+        self._set_stats(frame_count, shown, dropped, start, late_sum, late_max, bytes_sent)
+
+    def _cache_kind(self, gif_file, cache_file):
+        # magic of the sidecar made from this gif, None if there is none
+        try:
+            gif_size = os.stat(gif_file)[6]
+            with open(cache_file, "rb") as cache:
+                header = cache.read(struct.calcsize(self._cache_header))
+        except OSError:
+            return None
+        if len(header) != struct.calcsize(self._cache_header):
+            return None
+        magic, made_from_size = struct.unpack_from("<4sI", header)
+        return magic if made_from_size == gif_size else None
+
+    def _cache_fits(self, odg):
+        # every frame is counted as fully changed
+        frame_size = struct.calcsize(self._cache_frame) + memoryview(odg.bitmap).nbytes
+        size = struct.calcsize(self._cache_header) + odg.frame_count * frame_size
+        try:
+            fs_stat = os.statvfs("/")
+        except OSError:
+            return False
+        free = fs_stat[0] * fs_stat[4]
+        return size <= self._cache_max_bytes and size + self._cache_reserve_bytes <= free
+
+    def _mark_no_cache(self, cache_file):
+        try:
+            with open(cache_file, "wb") as cache:
+                cache.write(struct.pack(self._cache_header, self._no_cache_magic,
+                                        self._gif_size(cache_file), 0, 0, 0, 0))
+        except OSError:
+            pass
+
+    def _gif_size(self, cache_file):
+        return os.stat(cache_file[:-len(self._cache_suffix)])[6]
+
+    def _play_cache(self, gif_file, cache_file):
+        try:
+            gif_size = os.stat(gif_file)[6]
+            cache = open(cache_file, "rb")
+        except OSError:
+            return False
+
+        with cache:
+            header = cache.read(struct.calcsize(self._cache_header))
+            if len(header) != struct.calcsize(self._cache_header):
+                return False
+            magic, made_from_size, _, height, columns, frame_count = struct.unpack(self._cache_header, header)
+            if magic != self._cache_magic or made_from_size != gif_size:
+                return False
+
+            display_bus = display_helper.display.bus
+            stride = columns * 2
+            buffer = memoryview(bytearray(stride * height))
+            frame_header = bytearray(struct.calcsize(self._cache_frame))
+
+            late_sum = 0
+            late_max = 0
+            bytes_sent = 0
+            start = ticks_ms()
+            deadline = start
+            for f in range(frame_count):
+                cache.readinto(frame_header)
+                delay_ms, first, row_count = struct.unpack(self._cache_frame, frame_header)
+                rows = buffer[:row_count * stride]
+                cache.readinto(rows)
+
+                # every frame only holds what changed, none can be dropped
+                late = self._wait_until(deadline)
+                if row_count:
+                    self._push_rows(display_bus, rows, columns, first, first + row_count - 1)
+                late_sum += late
+                late_max = max(late_max, late)
+                bytes_sent += len(rows)
+
+                deadline = ticks_add(deadline, delay_ms)
+
+        self._set_stats(frame_count, frame_count, 0, start, late_sum, late_max, bytes_sent)
+        return True
+
+    def _open_cache(self, cache_file, width, height, columns, frame_count):
+        if cache_file is None:
+            return None
+        try:
+            cache = open(cache_file + ".tmp", "wb")
+            cache.write(struct.pack(self._cache_header, self._cache_magic, 0, width, height, columns,
+                                    frame_count))
+            return cache
+        except OSError:
+            # read-only filesystem, play without recording
+            return None
+
+    def _write_cache_frame(self, cache, cache_file, delay_ms, first, last, rows):
+        try:
+            cache.write(struct.pack(self._cache_frame, delay_ms, first, max(0, last + 1 - first)))
+            cache.write(rows)
+            return cache
+        except OSError:
+            # out of space, give up on the sidecar for good
+            cache.close()
+            self._remove(cache_file + ".tmp")
+            self._mark_no_cache(cache_file)
+            return None
+
+    def _close_cache(self, cache, cache_file):
+        try:
+            # the gif size is written last, an unfinished sidecar never matches
+            cache.seek(struct.calcsize("<4s"))
+            cache.write(struct.pack("<I", self._gif_size(cache_file)))
+            cache.close()
+            os.sync()
+            self._remove(cache_file)
+            os.rename(cache_file + ".tmp", cache_file)
+            os.sync()
+        except OSError:
+            cache.close()
+            self._remove(cache_file + ".tmp")
+
+    def _remove(self, file_name):
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+
+    def _wait_until(self, deadline):
+        late = ticks_diff(ticks_ms(), deadline)
+        if late < 0:
+            time.sleep(-late / 1000)
+            late = max(0, ticks_diff(ticks_ms(), deadline))
+        return late
+
+    def _changed_rows(self, buffer, height, stride):
+        row_crcs = self._row_crcs
+        if row_crcs is None:
+            # nothing pushed yet, every row counts as changed
+            row_crcs = self._row_crcs = array.array("I", [0] * height)
+            for y in range(height):
+                row_crcs[y] = binascii.crc32(buffer[y * stride:(y + 1) * stride])
+            return 0, height - 1
+
+        first = height
+        last = -1
+        for y in range(height):
+            crc = binascii.crc32(buffer[y * stride:(y + 1) * stride])
+            if crc != row_crcs[y]:
+                row_crcs[y] = crc
+                if first == height:
+                    first = y
+                last = y
+        return first, last
+
+    def _push_rows(self, display_bus, rows, columns, first, last):
+        display_bus.send(42, struct.pack(">hh", 0, columns - 1))
+        display_bus.send(43, struct.pack(">hh", first, last))
+        display_bus.send(44, rows)
+
+    def _set_stats(self, frame_count, shown, dropped, start, late_sum, late_max, bytes_sent):
+        elapsed_ms = ticks_diff(ticks_ms(), start)
+        self._stats = {
+            "frames": frame_count,
+            "shown": shown,
+            "dropped": dropped,
+            "fps": shown * 1000 / elapsed_ms if elapsed_ms else 0,
+            "mean_late_ms": late_sum / shown if shown else 0,
+            "max_late_ms": late_max,
+            "bytes_per_frame": bytes_sent / shown if shown else 0
+        }
+
+    def get_stats(self):
+        return self._stats
 
 
 display_helper = DisplayHelper()
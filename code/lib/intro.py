@@ -1,16 +1,10 @@
 import settings
-from hardware_helpers import display_helper, dfplayer_helper, gif_helper
-import gifio
-import time
-import struct
+from hardware_helpers import dfplayer_helper, gif_helper
 
 def playIntro():
-    stngs = settings.read_persistent_settings()
-
-    display = display_helper.display
-    odg = gifio.OnDiskGif(stngs["gif_file"])
-
-    mp3_index = stngs["intro_sound_index"]
+    mp3_index = settings.store["intro_sound_index"]
     dfplayer_helper.play_track(mp3_index)
+    # the scheduler isn't running yet, start the sound before the gif
+    dfplayer_helper.player.flush()
 
-    gif_helper.play_gif(odg)
+    gif_helper.play(settings.store["gif_file"])
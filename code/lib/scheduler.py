@@ -0,0 +1,58 @@
+import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+
+class Task:
+    def __init__(self, callback, period_ms):
+        self.callback = callback
+        self.period_ms = period_ms
+        self.deadline = ticks_ms()
+
+
+class Scheduler:
+    """
+    Cooperative scheduler for periodic tasks.
+
+    Every task is a plain callback that must return quickly; it is
+    called again `period_ms` after its previous deadline. Between
+    deadlines the loop sleeps instead of spinning.
+    """
+
+    def __init__(self):
+        self._tasks = []
+
+    def add_task(self, callback, period_ms):
+        task = Task(callback, period_ms)
+        self._tasks.append(task)
+        return task
+
+    def remove_task(self, task):
+        self._tasks.remove(task)
+
+    def run_once(self):
+        """
+        Run every task that is due and return the milliseconds left
+        until the next deadline.
+        """
+        now = ticks_ms()
+        wait_ms = None
+        for task in self._tasks:
+            if ticks_diff(task.deadline, now) <= 0:
+                task.callback()
+                task.deadline = ticks_add(task.deadline, task.period_ms)
+                now = ticks_ms()
+                if ticks_diff(task.deadline, now) < 0:
+                    # fell behind, don't try to catch up with a burst of calls
+                    task.deadline = ticks_add(now, task.period_ms)
+
+            task_wait_ms = ticks_diff(task.deadline, now)
+            if wait_ms is None or task_wait_ms < wait_ms:
+                wait_ms = task_wait_ms
+
+        return 0 if wait_ms is None else max(0, wait_ms)
+
+    def run(self):
+        while True:
+            wait_ms = self.run_once()
+            if wait_ms > 0:
+                time.sleep(wait_ms / 1000)
@@ -2,30 +2,54 @@ from adafruit_button import Button
 from terminalio import FONT
 import displayio
 from adafruit_display_text import label
-from adafruit_bitmap_font import bitmap_font
+import fonts
+from glyph_row import GlyphRow
 from hardware_helpers import time_helper, temp_helper, display_helper, dfplayer_helper, gif_helper
-import time
 import settings
+import ui_resources
 import microcontroller
-import re
 
 
 class Screen:
     _background_color = 0x000000
-    _text_color = settings.read_persistent_settings()["ui_text_color"]
+    _text_color = settings.store["ui_text_color"]
     _screen_width = 128
     _screen_height = 128
 
     def __init__(self, prev_screen=None):
         self._group = displayio.Group()
+        self._group.append(ui_resources.make_background(self._screen_width, self._screen_height))
+        self._built_text_color = self._text_color
+        self._render_epoch = 0
         if prev_screen is None:
             self.prev_screen = self
         else:
             self.prev_screen = prev_screen
 
+    def is_stale(self):
+        # the ScreenManager rebuilds pooled screens drawn in an old color
+        return self._built_text_color != Screen._text_color
+
+    @property
+    def render_epoch(self):
+        return self._render_epoch
+
+    def invalidate(self):
+        # something on the screen changed and needs a display refresh
+        self._render_epoch += 1
+
+    def on_enter(self):
+        pass
+
+    def on_exit(self):
+        pass
+
     def show(self):
         display_helper.display.root_group = self._group
 
+    def tick(self):
+        pass
+
     def up(self):
         dfplayer_helper.play_ui_beep()
         return self
@@ -41,49 +65,35 @@ class Screen:
 
 
 class ClockScreen(Screen):
-    def __init__(self):
+    _clock_chars = "0123456789: "
+    _temp_chars = "0123456789.-°C"
+
+    def __init__(self, prev_screen=None):
         super().__init__()
 
-        font = bitmap_font.load_font("FSSevegment-40.bdf", displayio.Bitmap)
-        font_small = bitmap_font.load_font("FSSevegment-30.bdf", displayio.Bitmap)
+        font = fonts.get_font("FSSevegment-40.bfa", preload=self._clock_chars)
+        font_small = fonts.get_font("FSSevegment-30.bfa", preload=self._temp_chars)
 
         self._display_dots = True
 
-        bitmap = displayio.Bitmap(128, 128, 1)
-        bitmap.fill(0)
-        pal = displayio.Palette(1)
-        pal[0] = self._background_color
-        background = displayio.TileGrid(bitmap, pixel_shader=pal)
-
-        self._clock_area = (
-            label.Label(
-                font,
-                text=self._getTime(),
-                color=self._text_color,
-                anchor_point=(0.5, 1.0)
-            )
-        )
-        self._clock_area.anchored_position = (64, 60)
+        # fixed per-character tiles: a tick only swaps the characters that
+        # changed (blinking colon, minutes, temperature tenths)
+        self._clock_area = GlyphRow(font, self._text_color, x=64, baseline=60)
+        self._clock_area.text = self._getTime()
 
-        self._temp_area = (
-            label.Label(
-                font_small,
-                text=self._getTemp(),
-                color=self._text_color,
-                anchor_point=(0.5, 0.0)
-            )
-        )
-        self._temp_area.anchored_position = (64, 68)
+        self._temp_area = GlyphRow(font_small, self._text_color, x=64, baseline=68 + font_small.ascent)
+        self._temp_area.text = self._getTemp()
 
-        self._group.append(background)
         self._group.append(self._clock_area)
         self._group.append(self._temp_area)
 
-    def show(self):
-        self._clock_area.text = self._getTime()
-        self._temp_area.text = self._getTemp()
-        display_helper.display.root_group = self._group
-        time.sleep(0.4)
+    def tick(self):
+        clock_text = self._getTime()
+        temp_text = self._getTemp()
+        if clock_text != self._clock_area.text or temp_text != self._temp_area.text:
+            self._clock_area.text = clock_text
+            self._temp_area.text = temp_text
+            self.invalidate()
 
     def _getTemp(self):
         return str(round(temp_helper.getTemp(), 1)) + "°C"
@@ -100,26 +110,24 @@ class ClockScreen(Screen):
         return time
 
     def back(self):
+        settings.store.flush()
         microcontroller.reset()
 
+    def on_enter(self):
+        self.tick()
+
     def forward(self):
-        return MainMenu(self)
+        return MainMenu
 
 
 class ClockSettingScreen(Screen):
     def __init__(self, prev_screen):
         super().__init__(prev_screen)
-        font = bitmap_font.load_font("FSSevegment-40.bdf", displayio.Bitmap)
+        font = fonts.get_font("FSSevegment-40.bfa", preload=ClockScreen._clock_chars)
 
         self._hh_selected = True
         self.curr_time = time_helper.getTime()
 
-        bitmap = displayio.Bitmap(128, 128, 1)
-        bitmap.fill(0)
-        pal = displayio.Palette(1)
-        pal[0] = self._background_color
-        background = displayio.TileGrid(bitmap, pixel_shader=pal)
-
         dot_area = (
             label.Label(
                 font,
@@ -162,11 +170,19 @@ class ClockSettingScreen(Screen):
         )
         self._mm_area.anchored_position = (64 + dot_area.width / 2, 64)
 
-        self._group.append(background)
         self._group.append(dot_area)
         self._group.append(self._hh_area)
         self._group.append(self._mm_area)
 
+    def on_enter(self):
+        self.curr_time = time_helper.getTime()
+        self._hh_area.text = self._format(self.curr_time[0])
+        self._mm_area.text = self._format(self.curr_time[1])
+        if not self._hh_selected:
+            self.unselect_area(self._mm_area)
+            self.select_area(self._hh_area)
+            self._hh_selected = True
+
     def _format(self, time):
         return "{:02d}".format(time)
 
@@ -253,8 +269,13 @@ class VolumeMenu(Screen):
                               label_scale=3)
         self._group.append(self.vol_btn)
 
-        dfplayer_helper.play_track(settings.read_persistent_settings()["intro_sound_index"])
-        dfplayer_helper.player.loop()
+    def on_enter(self):
+        # keep the sound going while the volume is adjusted
+        dfplayer_helper.on_track_finished(self._replay)
+        self._replay()
+
+    def _replay(self, track=None):
+        dfplayer_helper.play_track(settings.store["intro_sound_index"])
 
     def volume_str(self, volume):
         return str(volume) + "%"
@@ -268,7 +289,8 @@ class VolumeMenu(Screen):
         return self
 
     def back(self):
-        dfplayer_helper.player.stop()
+        dfplayer_helper.on_track_finished(None)
+        dfplayer_helper.stop()
         dfplayer_helper.save_volume_setting()
         return self.prev_screen
 
@@ -306,12 +328,28 @@ class BrightnessMenu(Screen):
         return self.prev_screen
 
 
+class MenuItem:
+    """
+    State of one ListMenu row. The menu derives the displayed text from
+    it, so the raw label is never parsed back out of a decorated one.
+    """
+    def __init__(self, label):
+        self.label = label
+        self.is_current = False
+        self.is_selected = False
+
+
 class ListMenu(Screen):
+    """
+    Shows a list of MenuItems through a fixed set of recycled Button slots,
+    one per row that can be on screen at once. Scrolling rebinds the
+    slots to other items, so the cost does not grow with the list.
+    """
     _menu_item_style = 1
     _menu_item_font = FONT
     _menu_item_width = Screen._screen_width
     _menu_item_height = 20
-    _buttons: []
+    _items: []
     _selected_button_indx: int
     _current_symbol = "-"
 
@@ -319,17 +357,22 @@ class ListMenu(Screen):
         super().__init__(prev_screen)
         self._selected_button_indx = 0
         self._current_button_index = 0
-
-    def getButtons(self, button_names):
+        self._items = []
+        self._offset = 0
+        # a scrolled list can show a partial row at the top and the bottom
+        self._slots = self.getButtons(self._screen_height // self._menu_item_height + 2)
+        self._slot_items = [None] * len(self._slots)
+        for slot in self._slots:
+            self._group.append(slot)
+
+    def getButtons(self, count):
         memu_items = []
-        for n, button in enumerate(button_names):
-            x = 0
-            y = n * self._menu_item_height
+        for n in range(count):
             memu_items.append(
                 Button(
-                    x=x,
-                    y=y,
-                    label=button,
+                    x=0,
+                    y=n * self._menu_item_height,
+                    label="",
                     width=self._menu_item_width,
                     height=self._menu_item_height,
                     label_font=self._menu_item_font,
@@ -342,58 +385,109 @@ class ListMenu(Screen):
                     style=self._menu_item_style))
         return memu_items
 
-    def _update_offset(self, offset):
-        for n, button in enumerate(self._buttons):
-            button.y = self._menu_item_height * n + offset
+    def set_items(self, labels):
+        self._items = [MenuItem(label) for label in labels]
+        self._selected_button_indx = 0
+        self._current_button_index = 0
+        self._offset = 0
+        self._slot_items = [None] * len(self._slots)
+        if self._items:
+            self._items[0].is_selected = True
+        self._bind_slots()
+
+    def _render_label(self, item):
+        if item.is_current:
+            return "{} {} {}".format(self._current_symbol, item.label, self._current_symbol)
+        return item.label
+
+    def _item_color(self, index):
+        return self._text_color
+
+    def _item_y(self, index):
+        return self._menu_item_height * index + self._offset
+
+    def _first_visible(self):
+        return -self._offset // self._menu_item_height
+
+    def _bind_slots(self):
+        first = self._first_visible()
+        for n, slot in enumerate(self._slots):
+            index = first + n
+            if index >= len(self._items):
+                slot.hidden = True
+                continue
+            if self._slot_items[n] != index:
+                self._slot_items[n] = index
+                self._bind_slot(slot, index)
+            slot.y = self._item_y(index)
+            slot.selected = self._items[index].is_selected
+            slot.hidden = False
+
+    def _bind_slot(self, slot, index):
+        slot.label = self._render_label(self._items[index])
+        color = self._item_color(index)
+        if slot.label_color != color:
+            slot.label_color = color
+            slot.selected_fill = color
+            slot.selected_outline = color
+
+    def _slot_of(self, index):
+        n = index - self._first_visible()
+        if 0 <= n < len(self._slots):
+            return self._slots[n]
+        return None
 
-    @property
-    def _selected_button(self):
-        return self._buttons[self._selected_button_indx]
+    def _update_offset(self, offset):
+        self._offset = offset
+        self._bind_slots()
 
     def selectItem(self, index):
-        self._selected_button.selected = False
-        self._buttons[index].selected = True
+        self._items[self._selected_button_indx].is_selected = False
+        self._items[index].is_selected = True
         self._selected_button_indx = index
+        self._bind_slots()
 
     def make_current(self, index):
-        curr_button = self._buttons[self._current_button_index]
-        curr_button.label = self._clear_format(curr_button.label)
-
+        if not 0 <= index < len(self._items):
+            return
+        curr_index = self._current_button_index
+        self._items[curr_index].is_current = False
         self._current_button_index = index
-        self._buttons[index].label = self._format_current(self._buttons[index].label)
+        self._items[index].is_current = True
 
-    def _format_current(self, label):
-        return "{} {} {}".format(self._current_symbol, label, self._current_symbol)
-
-    def _clear_format(self, label):
-        regex = r"{} (.*){}".format(self._current_symbol, self._current_symbol)
-        search_result = re.search(regex, label)
-        return label if search_result is None else search_result.group(1)
+        for item_index in (curr_index, index):
+            slot = self._slot_of(item_index)
+            if slot is not None:
+                slot.label = self._render_label(self._items[item_index])
 
     def down(self):
         dfplayer_helper.play_ui_beep()
-        if self._selected_button_indx == len(self._buttons) - 1:
+        if not self._items:
+            return self
+        if self._selected_button_indx == len(self._items) - 1:
             self.selectItem(0)
-            if self._selected_button.y < 0:
+            if self._item_y(0) < 0:
                 self._update_offset(0)
         else:
             self.selectItem(self._selected_button_indx + 1)
-            offset = self._screen_height - self._selected_button.y - self._menu_item_height
+            offset = self._screen_height - self._item_y(self._selected_button_indx) - self._menu_item_height
             if offset < 0:
-                self._update_offset(offset)
+                self._update_offset(self._offset + offset)
         return self
 
     def up(self):
         dfplayer_helper.play_ui_beep()
+        if not self._items:
+            return self
         if self._selected_button_indx == 0:
-            self.selectItem(len(self._buttons) - 1)
-            offset = self._screen_height - self._selected_button.y - self._menu_item_height
+            self.selectItem(len(self._items) - 1)
+            offset = self._screen_height - self._item_y(self._selected_button_indx) - self._menu_item_height
             if offset < 0:
-                self._update_offset(offset)
+                self._update_offset(self._offset + offset)
         else:
             self.selectItem(self._selected_button_indx - 1)
-            if self._selected_button.y < 0:
-                self._update_offset(0)
+            if self._item_y(self._selected_button_indx) < 0:
+                self._update_offset(-self._menu_item_height * self._selected_button_indx)
         return self
 
 
@@ -409,14 +503,15 @@ class MainMenu(ListMenu):
                 ["Select Gif", GifScreen],
                 ["Select Sound", IntroSoundSelectMenu]
             ]
-        self._buttons = self.getButtons(map(lambda menu_item: menu_item[0], self._menu_items))
-        self.selectItem(0)
-        for button in self._buttons:
-            self._group.append(button)
+        self.set_items(map(lambda menu_item: menu_item[0], self._menu_items))
 
     def forward(self):
         dfplayer_helper.play_ui_beep()
-        return self._menu_items[self._selected_button_indx][1](self)
+        next_screen = self._menu_items[self._selected_button_indx][1]
+        if next_screen is IntroSoundSelectMenu and not settings.store["sounds"]:
+            # disabled until the player reported its tracks
+            return self
+        return next_screen
 
 
 class GifScreen(ListMenu):
@@ -426,18 +521,13 @@ class GifScreen(ListMenu):
         self._gif_names = gif_helper.get_gif_names()
         self._gif_paths = gif_helper.get_gif_paths()
         self._current_gif_indx = gif_helper.get_intro_gif_index()
-        self._buttons = self.getButtons(self._gif_names)
-        self.selectItem(0)
+        self.set_items(self._gif_names)
         self.make_current(self._current_gif_indx)
-        for button in self._buttons:
-            self._group.append(button)
 
     def forward(self):
         dfplayer_helper.play_ui_beep()
-        stngs = settings.read_persistent_settings()
         self.make_current(self._selected_button_indx)
-        stngs["gif_file"] = self._gif_paths[self._selected_button_indx]
-        settings.save_persistent_settings(stngs)
+        settings.store["gif_file"] = self._gif_paths[self._selected_button_indx]
         return self
 
 
@@ -455,84 +545,61 @@ class UIColorMenu(ListMenu):
                 ("yellow", 0xffff00)
             )
 
-        self._buttons = self.getButtons(self._colors)
-
-        for button in self._buttons:
-            self._group.append(button)
-        self.selectItem(0)
+        self.set_items(map(lambda color: color[0], self._colors))
 
-        curr_color = settings.read_persistent_settings()["ui_text_color"]
+        curr_color = settings.store["ui_text_color"]
         curr_color_index = self._colors.index(next(filter(lambda c: c[1] == curr_color, self._colors)))
 
         self.make_current(curr_color_index)
 
-    def getButtons(self, colors):
-        memu_items = []
-        for n, color in enumerate(colors):
-            x = 0
-            y = n * self._menu_item_height
-            memu_items.append(
-                Button(
-                    x=x,
-                    y=y,
-                    label=color[0],
-                    width=self._menu_item_width,
-                    height=self._menu_item_height,
-                    label_font=self._menu_item_font,
-                    fill_color=self._background_color,
-                    label_color=color[1],
-                    selected_fill=color[1],
-                    selected_label=self._background_color,
-                    outline_color=self._background_color,
-                    selected_outline=color[1],
-                    style=self._menu_item_style))
-        return memu_items
+    def _item_color(self, index):
+        return self._colors[index][1]
 
     def forward(self):
         dfplayer_helper.play_ui_beep()
-        stngs = settings.read_persistent_settings()
         curr_color = self._colors[self._selected_button_indx][1]
-        stngs["ui_text_color"] = curr_color
-        settings.save_persistent_settings(stngs)
+        settings.store["ui_text_color"] = curr_color
         Screen._text_color = curr_color
-        return ClockScreen()
+        return ClockScreen
 
 
 class IntroSoundSelectMenu(ListMenu):
     def __init__(self, prev_screen):
         super().__init__(prev_screen)
-        stngs = settings.read_persistent_settings()
-        self._sounds = stngs["sounds"]
-        curr_sound_index = stngs["intro_sound_index"]
-
-        self._buttons = self.getButtons(self._sounds)
+        self._sounds = settings.store["sounds"]
+        curr_sound_index = settings.store["intro_sound_index"]
 
-        for button in self._buttons:
-            self._group.append(button)
-
-        self.selectItem(0)
+        self.set_items(self._sounds)
         self.make_current(curr_sound_index - 1)
 
-        dfplayer_helper.play_track(1)
+    def is_stale(self):
+        return super().is_stale() or self._sounds != settings.store["sounds"]
+
+    def on_enter(self):
+        self._play_selected()
 
     def up(self):
         super().up()
-        dfplayer_helper.play_track(self._selected_button_indx + 1)
+        self._play_selected()
         return self
 
     def down(self):
         super().down()
-        dfplayer_helper.play_track(self._selected_button_indx + 1)
+        self._play_selected()
         return self
 
+    def _play_selected(self):
+        if self._items:
+            dfplayer_helper.play_track(self._selected_button_indx + 1)
+
     def back(self):
-        dfplayer_helper.player.stop()
+        dfplayer_helper.stop()
         return self.prev_screen
 
     def forward(self):
-        stngs = settings.read_persistent_settings()
+        if not self._items:
+            return self
         curr_sound = self._selected_button_indx + 1
-        stngs["intro_sound_index"] = curr_sound
-        settings.save_persistent_settings(stngs)
+        settings.store["intro_sound_index"] = curr_sound
         self.make_current(self._selected_button_indx)
         return self
@@ -1,20 +1,70 @@
 import screen
-from hardware_helpers import btn_helper
+from hardware_helpers import btn_helper, display_helper
 
 class ScreenManager:
+    """
+    Owns one instance per screen class. Screens navigate by returning
+    either a screen instance (usually `prev_screen`) or a screen class,
+    which is looked up in the pool so revisiting a screen reuses its
+    displayio objects instead of allocating them again.
+    """
     def __init__(self):
-        self._current_screen = screen.ClockScreen()
+        self._screens = {}
+        self._rendered_screen = None
+        self._rendered_epoch = 0
+        self._current_screen = self._get_screen(screen.ClockScreen, None)
+        self._current_screen.on_enter()
+        self._current_screen.show()
+        self._render()
 
-    def show(self):
+    def _get_screen(self, screen_class, prev_screen):
+        next_screen = self._screens.get(screen_class)
+        if next_screen is None or next_screen.is_stale():
+            # drop the old instance before building its replacement
+            self._screens[screen_class] = None
+            next_screen = screen_class(prev_screen)
+            self._screens[screen_class] = next_screen
+        elif prev_screen is not None:
+            next_screen.prev_screen = prev_screen
+        return next_screen
+
+    def _switch(self, next_screen):
+        if isinstance(next_screen, type):
+            next_screen = self._get_screen(next_screen, self._current_screen)
+        if next_screen is self._current_screen:
+            return
+
+        self._current_screen.on_exit()
+        self._current_screen = next_screen
+        self._current_screen.on_enter()
+        self._current_screen.show()
+
+    def read_buttons(self):
         btn_helper.read_buttons()
 
         if btn_helper.up_btn.fell:
-            self._current_screen = self._current_screen.up()
+            self._switch(self._current_screen.up())
         elif btn_helper.down_btn.fell:
-            self._current_screen = self._current_screen.down()
+            self._switch(self._current_screen.down())
         elif btn_helper.fwd_btn.fell:
-            self._current_screen = self._current_screen.forward()
+            self._switch(self._current_screen.forward())
         elif btn_helper.back_btn.fell:
-            self._current_screen = self._current_screen.back()
+            self._switch(self._current_screen.back())
+        else:
+            return
+
+        # any handled press may have changed what is on screen
+        self._current_screen.invalidate()
+        self._render()
+
+    def refresh(self):
+        self._current_screen.tick()
+        self._render()
 
-        self._current_screen.show()
\ No newline at end of file
+    def _render(self):
+        screen = self._current_screen
+        if screen is self._rendered_screen and screen.render_epoch == self._rendered_epoch:
+            return
+        if display_helper.refresh():
+            self._rendered_screen = screen
+            self._rendered_epoch = screen.render_epoch
@@ -1,6 +1,9 @@
 import json
+import os
+import struct
 
 import board
+from adafruit_ticks import ticks_ms, ticks_add, ticks_less
 # buttons
 up_btn_pin = board.GP19
 down_btn_pin = board.GP18
@@ -35,6 +38,11 @@ clock_sda = board.GP20
 temp_pin = board.GP26
 
 settings_file_name = "settings.json"
+settings_record_file_name = "settings.bin"
+
+# "json" keeps the human-editable settings.json, "record" uses the packed
+# settings.bin (settings.json is still read once to migrate)
+settings_format = "json"
 
 default_settings =\
 {
@@ -48,22 +56,235 @@ default_settings =\
             (8, 10000),
             (22.7, 5333)
         ),
-    "ui_text_color": 0xffffff
+    "ui_text_color": 0xffffff,
+    "sounds": [],
+    "temp_sample_window": 10,
+    "temp_sample_period_ms": 50,
+    "track_count": 0
 }
 
+settings_flush_delay_ms = 3000
+
+
+class JsonCodec:
+    binary = False
+
+    def encode(self, settings):
+        return json.dumps(settings)
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class RecordCodec:
+    """
+    Packed settings record:
+
+        version (B) | checksum (H) | fixed fields | gif_file | sounds
+
+    The checksum is the 16-bit sum of the body bytes. Strings are stored
+    as a 16-bit length followed by UTF-8 bytes, `sounds` is joined with
+    newlines.
+    """
+    binary = True
+
+    version = 3
+    _header_format = "<BH"
+    _body_format = "<BBHI3f3IHHH"
+    _str_len_format = "<H"
+
+    def encode(self, settings):
+        readings = settings["temp_calibration_readings"]
+        body = struct.pack(
+            self._body_format,
+            settings["dfplayer_volume"],
+            settings["display_brightness_percent"],
+            settings["intro_sound_index"],
+            settings["ui_text_color"],
+            readings[0][0], readings[1][0], readings[2][0],
+            readings[0][1], readings[1][1], readings[2][1],
+            settings["temp_sample_window"],
+            settings["temp_sample_period_ms"],
+            settings["track_count"])
+        body += self._encode_str(settings["gif_file"])
+        body += self._encode_str("\n".join(settings["sounds"]))
+        header = struct.pack(self._header_format, self.version, self._checksum(body))
+        return header + body
+
+    def decode(self, data):
+        header_size = struct.calcsize(self._header_format)
+        if len(data) < header_size + struct.calcsize(self._body_format):
+            raise ValueError("settings record too short")
+
+        version, checksum = struct.unpack_from(self._header_format, data)
+        body = memoryview(data)[header_size:]
+        if version != self.version:
+            raise ValueError("settings record version mismatch")
+        if checksum != self._checksum(body):
+            raise ValueError("settings record checksum mismatch")
+
+        (volume, brightness, sound_index, text_color,
+         t1, t2, t3, r1, r2, r3,
+         sample_window, sample_period_ms, track_count) = struct.unpack_from(self._body_format, body)
+        offset = struct.calcsize(self._body_format)
+        gif_file, offset = self._decode_str(body, offset)
+        sounds, offset = self._decode_str(body, offset)
+        if offset != len(body):
+            raise ValueError("settings record has wrong size")
+        return {
+            "dfplayer_volume": volume,
+            "display_brightness_percent": brightness,
+            "intro_sound_index": sound_index,
+            "ui_text_color": text_color,
+            "temp_calibration_readings": [[t1, r1], [t2, r2], [t3, r3]],
+            "gif_file": gif_file,
+            "sounds": sounds.split("\n") if sounds else [],
+            "temp_sample_window": sample_window,
+            "temp_sample_period_ms": sample_period_ms,
+            "track_count": track_count
+        }
+
+    def _encode_str(self, value):
+        data = value.encode()
+        return struct.pack(self._str_len_format, len(data)) + data
+
+    def _decode_str(self, data, offset):
+        start = offset + struct.calcsize(self._str_len_format)
+        if start > len(data):
+            raise ValueError("settings record has wrong size")
+        length = struct.unpack_from(self._str_len_format, data, offset)[0]
+        offset = start
+        if offset + length > len(data):
+            raise ValueError("settings record has wrong size")
+        return bytes(data[offset:offset + length]).decode(), offset + length
+
+    @staticmethod
+    def _checksum(data):
+        return sum(data) & 0xFFFF
+
+
+class SettingsStore:
+    """
+    Process-wide settings kept in RAM.
+
+    The settings file is read once, on first access. Writes only mark
+    keys dirty; `update` flushes them in one write after
+    `settings_flush_delay_ms` of quiet, `flush` does it right away.
+
+    A flush writes a temporary file and renames it over the old one, so
+    a power cut leaves either the old or the new settings, never half
+    of both.
+    """
+
+    def __init__(self, file_name, defaults, flush_delay_ms, codec, legacy_file_name=None):
+        self._file_name = file_name
+        self._tmp_file_name = file_name + ".tmp"
+        self._legacy_file_name = legacy_file_name
+        self._defaults = defaults
+        self._flush_delay_ms = flush_delay_ms
+        self._codec = codec
+        self._settings = None
+        self._dirty = set()
+        self._flush_deadline = None
+
+    def _read_file(self, file_name, codec):
+        with open(file_name, "rb" if codec.binary else "r") as settings_file:
+            return codec.decode(settings_file.read())
+
+    def _load(self):
+        if self._settings is None:
+            for file_name in (self._file_name, self._tmp_file_name):
+                try:
+                    self._settings = self._read_file(file_name, self._codec)
+                except (OSError, ValueError):
+                    continue
+                if file_name == self._tmp_file_name:
+                    # a flush died before the rename; move the only good
+                    # copy into place before the next flush overwrites it
+                    try:
+                        self._replace_with_tmp()
+                    except OSError:
+                        pass
+                break
+            else:
+                self._settings = dict(self._defaults)
+                if self._legacy_file_name is not None:
+                    try:
+                        self._settings.update(self._read_file(self._legacy_file_name, JsonCodec()))
+                    except (OSError, ValueError):
+                        pass
+                self._dirty.update(self._settings)
+                self.flush()
+
+            # keys added after the settings file was written
+            for key in self._defaults:
+                if key not in self._settings:
+                    self._settings[key] = self._defaults[key]
+        return self._settings
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        curr_settings = self._load()
+        if key in curr_settings and curr_settings[key] == value:
+            return
+        curr_settings[key] = value
+        self._dirty.add(key)
+        self._flush_deadline = ticks_add(ticks_ms(), self._flush_delay_ms)
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def get(self, key, default=None):
+        return self._load().get(key, default)
+
+    @property
+    def dirty(self):
+        return bool(self._dirty)
+
+    def as_dict(self):
+        return self._load()
+
+    def update(self):
+        if self._flush_deadline is not None and not ticks_less(ticks_ms(), self._flush_deadline):
+            self.flush()
+
+    def flush(self):
+        if self._dirty:
+            self._write_atomic(self._codec.encode(self._settings))
+            self._dirty.clear()
+        self._flush_deadline = None
+
+    def _write_atomic(self, data):
+        with open(self._tmp_file_name, "wb" if self._codec.binary else "w") as settings_file:
+            settings_file.write(data)
+        os.sync()
+        self._replace_with_tmp()
+
+    def _replace_with_tmp(self):
+        # FAT can't rename over an existing file; until the rename lands
+        # _load falls back to the complete temporary file
+        try:
+            os.remove(self._file_name)
+        except OSError:
+            pass
+        os.rename(self._tmp_file_name, self._file_name)
+        os.sync()
+
+
+if settings_format == "record":
+    store = SettingsStore(settings_record_file_name, default_settings, settings_flush_delay_ms,
+                          RecordCodec(), legacy_file_name=settings_file_name)
+else:
+    store = SettingsStore(settings_file_name, default_settings, settings_flush_delay_ms, JsonCodec())
+
+
 def save_persistent_settings(settings):
-    settings_file = open(settings_file_name, "w")
-    json.dump(settings, settings_file)
-    settings_file.close()
+    for key in settings:
+        store[key] = settings[key]
+    store.flush()
 
 
 def read_persistent_settings():
-    try:
-        settings_file = open(settings_file_name, "r")
-    except:
-        save_persistent_settings(default_settings)
-        return default_settings
-
-    settings = json.load(settings_file)
-    settings_file.close()
-    return settings
+    return dict(store.as_dict())
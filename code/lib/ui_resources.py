@@ -0,0 +1,15 @@
+import displayio
+
+# One pixel painted in the background color, scaled up to fill the
+# screen; shared by every screen instead of a full-size bitmap each.
+background_bitmap = displayio.Bitmap(1, 1, 1)
+background_palette = displayio.Palette(1)
+background_palette[0] = 0x000000
+
+
+def make_background(width, height):
+    # a TileGrid can only be in one group, so each screen gets its own
+    # (tiny) one referencing the shared bitmap and palette
+    background = displayio.Group(scale=max(width, height))
+    background.append(displayio.TileGrid(background_bitmap, pixel_shader=background_palette))
+    return background
@@ -0,0 +1,32 @@
+"""
+Host-side tests for the device code; run from the repository root with
+
+    python -m pytest -q tests
+
+The CircuitPython-only modules are replaced by the stand-ins in
+tools/host_modules.py where a test needs them.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "code", "lib"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import pytest  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture(scope="session")
+def device_dir(tmp_path_factory):
+    """
+    Scratch copy of the CIRCUITPY drive, with the host stand-ins
+    installed; device modules must be imported inside the test.
+    """
+    import host_modules  # pylint: disable=import-outside-toplevel
+
+    cwd = os.getcwd()
+    path = tmp_path_factory.mktemp("circuitpy")
+    host_modules.install()
+    host_modules.enter_device_dir(str(path))
+    yield path
+    os.chdir(cwd)
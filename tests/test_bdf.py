@@ -0,0 +1,100 @@
+import os
+import re
+
+import pytest
+
+from host_modules import CODE_DIR, HostBitmap
+
+SOURCE = os.path.join(CODE_DIR, "FSSevegment-30.bdf")
+
+
+@pytest.fixture
+def bdf(device_dir):
+    from adafruit_bitmap_font import bdf as bdf_module  # pylint: disable=import-outside-toplevel
+    return bdf_module
+
+
+def read_source():
+    with open(SOURCE, "rb") as source:
+        return source.read()
+
+
+def glyph_block(data, name):
+    return re.search(b"STARTCHAR " + name + b"\n.*?ENDCHAR\n", data, re.S).group(0)
+
+
+def with_unencoded_glyph(data):
+    # a copy of "one" that no code point maps to, ahead of the real one
+    unencoded = glyph_block(data, b"one").replace(b"STARTCHAR one", b"STARTCHAR unencoded")
+    unencoded = re.sub(b"ENCODING \\d+", b"ENCODING -1", unencoded)
+    first = data.index(b"STARTCHAR")
+    return data[:first] + unencoded + data[first:]
+
+
+def write_font(tmp_path, data):
+    path = str(tmp_path / "font.bdf")
+    with open(path, "wb") as font_file:
+        font_file.write(data)
+    return path
+
+
+def glyph_data(glyph):
+    return (glyph.width, glyph.height, glyph.dx, glyph.dy, glyph.shift_x, glyph.shift_y,
+            bytes(glyph.bitmap._pixels))  # pylint: disable=protected-access
+
+
+def reference_glyphs(bdf, chars):
+    with open(SOURCE, "rb") as source:
+        font = bdf.BDF(source, HostBitmap)
+        return {char: glyph_data(font.get_glyph(ord(char))) for char in chars}
+
+
+def load(bdf, path):
+    return bdf.BDF(open(path, "rb"), HostBitmap, path)  # pylint: disable=consider-using-with
+
+
+def test_unencoded_glyphs_are_not_indexed(bdf, tmp_path):
+    path = write_font(tmp_path, with_unencoded_glyph(read_source()))
+    font = load(bdf, path)
+
+    assert glyph_data(font.get_glyph(ord("1"))) == reference_glyphs(bdf, "1")["1"]
+    assert -1 not in font._index  # pylint: disable=protected-access
+    assert os.path.exists(path + ".idx")
+
+
+def test_saved_index_is_reused(bdf, tmp_path):
+    path = write_font(tmp_path, read_source())
+    first = load(bdf, path)
+    first.get_glyph(ord("0"))
+
+    font = load(bdf, path)
+    assert font._index is not None  # pylint: disable=protected-access
+    assert (font.ascent, font.descent) == (first.ascent, first.descent)
+    assert (font.point_size, font.x_resolution, font.y_resolution) == (29, 75, 75)
+    assert glyph_data(font.get_glyph(ord("2"))) == reference_glyphs(bdf, "2")["2"]
+
+
+def test_stale_index_of_same_size_is_rebuilt(bdf, tmp_path):
+    data = read_source()
+    path = write_font(tmp_path, data)
+    load(bdf, path).get_glyph(ord("0"))
+
+    # same size, but "one" and "two" trade places
+    one = glyph_block(data, b"one")
+    two = glyph_block(data, b"two")
+    write_font(tmp_path, data.replace(one + two, two + one))
+
+    font = load(bdf, path)
+    expected = reference_glyphs(bdf, "12")
+    assert glyph_data(font.get_glyph(ord("1"))) == expected["1"]
+    assert glyph_data(font.get_glyph(ord("2"))) == expected["2"]
+
+
+def test_compiler_skips_unencoded_glyphs(bdf, tmp_path):
+    from compile_font import _code_points  # pylint: disable=import-outside-toplevel
+    path = write_font(tmp_path, with_unencoded_glyph(read_source()))
+    with open(path, "rb") as font_file:
+        code_points = _code_points(bdf.BDF(font_file, HostBitmap))
+
+    assert ord("1") in code_points
+    assert min(code_points) >= 0
@@ -0,0 +1,105 @@
+import pytest
+
+
+@pytest.fixture
+def player_module(device_dir, monkeypatch):
+    import host_modules  # pylint: disable=import-outside-toplevel
+    import DFPlayer  # pylint: disable=import-outside-toplevel
+    clock = host_modules.Clock()
+    monkeypatch.setattr(DFPlayer, "ticks_ms", clock.ticks_ms)
+    monkeypatch.setattr(DFPlayer.time, "sleep", clock.sleep)
+    return DFPlayer
+
+
+@pytest.fixture
+def uart():
+    import host_modules  # pylint: disable=import-outside-toplevel
+    return host_modules.UART()
+
+
+@pytest.fixture
+def player(player_module, uart):
+    player = player_module.DFPlayer(uart=uart)
+    player.flush()
+    del uart.written[:]
+    return player
+
+
+def frame(cmd, data=0):
+    body = bytes([0xFF, 0x06, cmd, 0x00, data >> 8, data & 0xFF])
+    checksum = -sum(body) & 0xFFFF
+    return b"\x7E" + body + bytes([checksum >> 8, checksum & 0xFF, 0xEF])
+
+
+def commands(uart):
+    return [data[3] for data in uart.written]
+
+
+def test_every_command_is_one_frame_write(player_module, uart):
+    player = player_module.DFPlayer(uart=uart, volume=50)
+    player.flush()
+
+    assert commands(uart) == [0x09, 0x06, 0x07]
+    assert all(len(data) == 10 for data in uart.written)
+
+
+def test_play_frame_bytes(player, uart):
+    player.play(track=3)
+    player.flush()
+
+    assert uart.written == [bytes.fromhex("7EFF0603000003FEF5EF")]
+    assert frame(0x03, 3) == uart.written[0]
+
+
+def answer_writes(uart, answers):
+    """Make the fake module send the next of `answers` after each write"""
+    write = uart.write
+
+    def answering_write(data):
+        count = write(data)
+        if answers:
+            uart.receive(answers.pop(0))
+        return count
+
+    uart.write = answering_write
+
+
+def test_response_checksum_is_checked(player, uart):
+    broken = bytearray(frame(0x43, 15))
+    broken[8] ^= 0xFF
+    answer_writes(uart, [frame(0x43, 15), bytes(broken)])
+
+    assert player.get_volume() == 50
+    assert player.get_volume() == 0
+
+
+def test_queued_volume_changes_coalesce(player_module, uart):
+    player = player_module.DFPlayer(uart=uart, volume=50)
+    player.set_volume(10)
+    player.set_volume(80)
+    player.flush()
+
+    assert commands(uart) == [0x09, 0x06, 0x07]
+    assert uart.written[1] == frame(0x06, 80 * 0x1E // 100)
+
+
+def test_newest_transport_command_wins(player, uart):
+    player.play(track=1)
+    player.play(track=2)
+    player.stop()
+    player.flush()
+
+    assert uart.written == [frame(0x16)]
+
+
+def test_feedback_resyncs_after_a_broken_frame(player, uart):
+    finished = []
+    player.on_event(player.EVENT_TRACK_FINISHED, lambda event, data: finished.append(data))
+    broken = bytearray(frame(player.EVENT_TRACK_FINISHED, 4))
+    broken[7] ^= 0xFF
+
+    # noise, a cut-off frame, a frame with a bad checksum, then good ones
+    uart.receive(b"\x00\x12" + frame(0x3D, 1)[:4] + frame(0x3D, 2) + bytes(broken) + frame(0x3D, 5))
+    player.poll()
+
+    assert finished == [2, 5]
@@ -0,0 +1,49 @@
+import builtins
+
+import pytest
+
+
+@pytest.fixture
+def font_opens(device_dir, monkeypatch):
+    """File names passed to open(), starting from an empty font cache"""
+    import fonts  # pylint: disable=import-outside-toplevel
+    monkeypatch.setattr(fonts, "_fonts", {})
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    return opened
+
+
+def font_files(opened):
+    return [name for name in opened if str(name).endswith(".bfa")]
+
+
+def test_repeated_clock_screens_open_each_font_once(font_opens):
+    import screen  # pylint: disable=import-outside-toplevel
+    for _ in range(5):
+        screen.ClockScreen(None)
+
+    assert sorted(font_files(font_opens)) == ["FSSevegment-30.bfa", "FSSevegment-40.bfa"]
+
+
+def test_screens_share_the_clock_font(font_opens):
+    import screen  # pylint: disable=import-outside-toplevel
+    clock = screen.ClockScreen(None)
+    screen.ClockSettingScreen(clock)
+    screen.ClockSettingScreen(clock)
+
+    assert font_files(font_opens).count("FSSevegment-40.bfa") == 1
+
+
+def test_get_font_returns_the_cached_font(font_opens):
+    import fonts  # pylint: disable=import-outside-toplevel
+    first = fonts.get_font("FSSevegment-30.bfa")
+    again = fonts.get_font("FSSevegment-30.bfa", preload="0123")
+
+    assert again is first
+    assert font_files(font_opens) == ["FSSevegment-30.bfa"]
@@ -0,0 +1,78 @@
+import array
+
+import pytest
+
+
+class PaddedBitmap(array.array):
+    """RGB565 bitmap with rows padded to 32 bits, like displayio's"""
+
+    def __new__(cls, width, height):
+        pitch = width + width % 2
+        bitmap = super().__new__(cls, "H", bytes(pitch * height * 2))
+        bitmap.width = width
+        bitmap.height = height
+        bitmap.pitch = pitch
+        return bitmap
+
+
+class FakeGif:
+    """OnDiskGif playing `frames`, each a list of (row, color) to paint"""
+
+    def __init__(self, width, height, frames):
+        self.bitmap = PaddedBitmap(width, height)
+        self.frame_count = len(frames)
+        self._frames = iter(frames)
+
+    def next_frame(self):
+        bitmap = self.bitmap
+        for row, color in next(self._frames):
+            start = row * bitmap.pitch
+            for x in range(bitmap.width):
+                bitmap[start + x] = color
+        return 0
+
+
+class RecordingBus:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, command, data):
+        self.sent.append((command, bytes(memoryview(data).cast("B"))))
+
+
+@pytest.fixture
+def gif_helper(device_dir, monkeypatch):
+    import hardware_helpers  # pylint: disable=import-outside-toplevel
+    bus = RecordingBus()
+    monkeypatch.setattr(hardware_helpers.display_helper.display, "bus", bus)
+    # a desynced sidecar reads pixels as delays, don't wait for them
+    monkeypatch.setattr(hardware_helpers.time, "sleep", lambda seconds: None)
+    helper = hardware_helpers.gif_helper
+    helper.bus = bus
+    return helper
+
+
+@pytest.mark.parametrize("width", [7, 8])
+def test_sidecar_replays_what_was_pushed(gif_helper, tmp_path, width):
+    height = 6
+    frames = [
+        [(row, 1) for row in range(height)],
+        [(2, 2), (3, 3)],
+        [],
+        [(0, 4), (height - 1, 5)],
+    ]
+    gif_file = str(tmp_path / "odd.gif")
+    with open(gif_file, "wb") as gif:
+        gif.write(b"GIF89a")
+    cache_file = gif_file + gif_helper._cache_suffix  # pylint: disable=protected-access
+
+    gif_helper.play_gif(FakeGif(width, height, frames), cache_file)
+    pushed = list(gif_helper.bus.sent)
+    del gif_helper.bus.sent[:]
+    assert gif_helper._play_cache(gif_file, cache_file)  # pylint: disable=protected-access
+
+    assert gif_helper.bus.sent == pushed
+    pitch = width + width % 2
+    writes = [data for command, data in pushed if command == 44]
+    assert [len(data) for data in writes] == [height * pitch * 2, 2 * pitch * 2, height * pitch * 2]
+    assert (42, bytes([0, 0, 0, pitch - 1])) in pushed
@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.fixture
+def screen(device_dir):
+    import screen as screen_module  # pylint: disable=import-outside-toplevel
+    return screen_module
+
+
+def visible_labels(menu):
+    return [slot.label for slot in menu._slots if not slot.hidden and slot.y < menu._screen_height]
+
+
+def make_menu(screen, labels):
+    menu = screen.ListMenu(None)
+    menu.set_items(labels)
+    return menu
+
+
+def test_current_item_is_decorated(screen):
+    menu = make_menu(screen, ["one", "two"])
+    menu.make_current(1)
+    assert visible_labels(menu) == ["one", "- two -"]
+
+
+def test_labels_with_dashes_survive_moving_the_current_item(screen):
+    labels = ["a-b", "- c -", "-", "d - e-"]
+    menu = make_menu(screen, labels)
+    for index in range(len(labels)):
+        menu.make_current(index)
+    menu.make_current(0)
+
+    assert [item.label for item in menu._items] == labels
+    assert visible_labels(menu) == ["- a-b -", "- c -", "-", "d - e-"]
+
+
+def test_render_label_follows_item_state(screen):
+    menu = make_menu(screen, [])
+    item = screen.MenuItem("x - y")
+    assert menu._render_label(item) == "x - y"
+    item.is_current = True
+    assert menu._render_label(item) == "- x - y -"
+    item.is_current = False
+    assert menu._render_label(item) == "x - y"
+
+
+def test_selection_moves_between_items(screen):
+    menu = make_menu(screen, ["one", "two", "three"])
+    menu.down()
+    assert [item.is_selected for item in menu._items] == [False, True, False]
+    menu.up()
+    menu.up()
+    assert [item.is_selected for item in menu._items] == [False, False, True]
+
+
+def test_scrolling_keeps_the_selection_on_screen(screen):
+    menu = make_menu(screen, ["item {}".format(i) for i in range(40)])
+    for _ in range(25):
+        menu.down()
+    selected = [slot for slot in menu._slots if slot.selected]
+    assert [slot.label for slot in selected] == ["item 25"]
+    assert 0 <= selected[0].y <= menu._screen_height - menu._menu_item_height
+
+
+def test_empty_list_ignores_navigation(screen):
+    menu = make_menu(screen, [])
+    menu.make_current(-1)
+    assert menu.up() is menu
+    assert menu.down() is menu
+    assert visible_labels(menu) == []
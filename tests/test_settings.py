@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def settings(device_dir, tmp_path, monkeypatch):
+    import settings as settings_module  # pylint: disable=import-outside-toplevel
+    monkeypatch.chdir(tmp_path)
+    return settings_module
+
+
+def make_settings(settings, **changes):
+    values = dict(settings.default_settings)
+    # exact in the record's 32-bit floats
+    values["temp_calibration_readings"] = [[-16, 33000], [8, 10000], [22.5, 5333]]
+    values.update(changes)
+    return values
+
+
+def make_store(settings, codec=None):
+    return settings.SettingsStore("settings.json", settings.default_settings,
+                                  settings.settings_flush_delay_ms, codec or settings.JsonCodec())
+
+
+def test_record_round_trip(settings):
+    codec = settings.RecordCodec()
+    values = make_settings(
+        settings,
+        gif_file="gif/" + "long-name-" * 20 + ".gif",
+        sounds=["sound {:03d} with a long title".format(n) for n in range(300)],
+        intro_sound_index=300,
+        track_count=301)
+
+    assert codec.decode(codec.encode(values)) == values
+
+
+def test_record_rejects_bad_version_and_checksum(settings):
+    codec = settings.RecordCodec()
+    data = codec.encode(make_settings(settings))
+
+    with pytest.raises(ValueError):
+        codec.decode(bytes([codec.version + 1]) + data[1:])
+    corrupt = bytearray(data)
+    corrupt[-1] ^= 0x01
+    with pytest.raises(ValueError):
+        codec.decode(bytes(corrupt))
+    # the cut-off byte is a zero length byte, so the checksum still matches
+    with pytest.raises(ValueError):
+        codec.decode(data[:-1])
+
+
+def test_orphaned_tmp_file_is_moved_into_place(settings):
+    with open("settings.json.tmp", "w") as tmp_file:
+        json.dump(make_settings(settings, dfplayer_volume=42), tmp_file)
+
+    store = make_store(settings)
+    assert store["dfplayer_volume"] == 42
+    assert os.path.exists("settings.json")
+    assert not os.path.exists("settings.json.tmp")
+
+    store["dfplayer_volume"] = 43
+    store.flush()
+    assert make_store(settings)["dfplayer_volume"] == 43
+
+
+def test_missing_keys_are_filled_from_defaults(settings):
+    old = make_settings(settings, dfplayer_volume=42)
+    del old["track_count"]
+    del old["temp_sample_window"]
+    with open("settings.json", "w") as settings_file:
+        json.dump(old, settings_file)
+
+    store = make_store(settings)
+    assert store["dfplayer_volume"] == 42
+    assert store["track_count"] == settings.default_settings["track_count"]
+    assert store["temp_sample_window"] == settings.default_settings["temp_sample_window"]
+
+
+def test_flush_writes_once_and_leaves_no_tmp_file(settings):
+    store = make_store(settings, settings.RecordCodec())
+    store["intro_sound_index"] = 300
+    store["sounds"] = ["a", "b"]
+    store.flush()
+
+    assert not os.path.exists("settings.json.tmp")
+    reloaded = make_store(settings, settings.RecordCodec())
+    assert (reloaded["intro_sound_index"], reloaded["sounds"]) == (300, ["a", "b"])
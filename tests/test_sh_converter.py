@@ -0,0 +1,31 @@
+from SH_converter import SH_converter
+
+# default_settings["temp_calibration_readings"] and TempHelper's divider
+CALIBRATION = ((-16, 33000), (8, 10000), (22.7, 5333))
+R_REF = 10030
+V_REF = 65535
+
+
+def closed_form(converter, adc):
+    return converter.temperature(R_REF * (V_REF / adc - 1))
+
+
+def test_lookup_matches_closed_form():
+    converter = SH_converter.from_points(CALIBRATION)
+    lookup = converter.adc_lookup(R_REF)
+    worst = max(
+        abs(lookup.temperature(adc) - closed_form(converter, adc))
+        for adc in range(3000, 63001)
+    )
+    assert worst < 0.2
+
+
+def test_lookup_takes_the_running_mean():
+    lookup = SH_converter.from_points(CALIBRATION).adc_lookup(R_REF)
+    assert lookup.temperature(20000.75) == lookup.temperature(20000)
+
+
+def test_lookup_is_monotonic():
+    lookup = SH_converter.from_points(CALIBRATION).adc_lookup(R_REF)
+    temps = [lookup.temperature_tenths(adc) for adc in range(1000, 64001, 97)]
+    assert temps == sorted(temps)
@@ -0,0 +1,165 @@
+"""
+Compare BDF glyph loads with and without the glyph offset index.
+
+Runs on the host with regular Python:
+
+    python tools/bench_bdf_index.py [font.bdf ...]
+
+For every BDF font in code/ (or the ones given) loads the glyphs the
+clock screen preloads, then one more glyph as a later cache miss, in
+three ways: with the old loader that scans the file for every load
+(copied below), with the index built and saved on the way (cold
+`.idx`), and with the index read back from the `.idx` (warm). Reports
+the best time and the lines read from the font. The fonts are copied
+to a scratch directory, so no `.idx` is left in the source tree.
+"""
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import host_modules  # pylint: disable=wrong-import-position
+
+host_modules.install()
+
+# pylint: disable=wrong-import-position
+from adafruit_bitmap_font import bdf
+from host_modules import HostBitmap
+from fontio import Glyph
+# pylint: enable=wrong-import-position
+
+PRELOAD = "0123456789:°C"
+MISS = "A"
+REPEAT = 5
+
+
+class _CountingFile:
+    """Font file that counts the lines read from it"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self.lines = 0
+
+    def readline(self):
+        self.lines += 1
+        return self._file.readline()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class _ScanningBDF(bdf.BDF):
+    """The loader before the index: every load scans the whole file"""
+
+    def load_glyphs(self, code_points):
+        # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+        remaining = set(ord(c) for c in code_points)
+        remaining -= set(code_point for code_point in remaining if self._glyphs.get(code_point))
+        if not remaining:
+            return
+        character = False
+        desired = False
+        info = {}
+        current_y = 0
+        rounded_x = 1
+        code_point = None
+        self.file.seek(0)
+        while True:
+            line = self.file.readline()
+            if not line:
+                break
+            if line.startswith(b"STARTCHAR"):
+                character = True
+            elif line.startswith(b"ENDCHAR"):
+                character = False
+                if desired:
+                    bounds = info["bounds"]
+                    shift = info["shift"]
+                    gc.collect()
+                    self._glyphs[code_point] = Glyph(info["bitmap"], 0, *bounds, *shift)
+                    remaining.remove(code_point)
+                    if not remaining:
+                        return
+                desired = False
+            elif line.startswith(b"ENCODING"):
+                code_point = int(line.split()[1])
+                if code_point in remaining:
+                    desired = True
+                    info = {}
+            elif not desired:
+                pass
+            elif line.startswith(b"BBX"):
+                bounds = tuple(int(value) for value in line.split()[1:])
+                info["bounds"] = bounds
+                info["bitmap"] = self.bitmap_class(bounds[0], bounds[1], 2)
+            elif line.startswith(b"BITMAP"):
+                rounded_x = (info["bounds"][0] + 7) // 8
+                current_y = 0
+            elif line.startswith(b"DWIDTH"):
+                info["shift"] = tuple(int(value) for value in line.split()[1:])
+            elif character and not line.startswith(b"SWIDTH"):
+                bits = int(line.strip(), 16)
+                width = info["bounds"][0]
+                start = current_y * width
+                for x in range(width):
+                    info["bitmap"][start + x] = (bits >> (rounded_x * 8 - 1 - x)) & 1
+                current_y += 1
+
+
+def _load(make_font, path):
+    font_file = _CountingFile(path)
+    start = time.perf_counter()
+    font = make_font(font_file)
+    font.load_glyphs(PRELOAD)
+    preload_s = time.perf_counter() - start
+    preload_lines = font_file.lines
+    start = time.perf_counter()
+    font.load_glyphs(MISS)
+    miss_s = time.perf_counter() - start
+    font_file.close()
+    return preload_s, preload_lines, miss_s, font_file.lines - preload_lines
+
+
+def _best(make_font, path, before=None):
+    runs = []
+    for _ in range(REPEAT):
+        if before is not None:
+            before()
+        runs.append(_load(make_font, path))
+    return min(run[0] for run in runs), runs[0][1], min(run[2] for run in runs), runs[0][3]
+
+
+def _remove(file_name):
+    try:
+        os.remove(file_name)
+    except OSError:
+        pass
+
+
+def main(fonts):
+    work_dir = tempfile.mkdtemp(prefix="bdf-")
+    for source in fonts:
+        path = os.path.join(work_dir, os.path.basename(source))
+        shutil.copy(source, path)
+        results = (
+            ("scan", _best(lambda f: _ScanningBDF(f, HostBitmap), path)),
+            ("cold .idx", _best(lambda f: bdf.BDF(f, HostBitmap, path), path,
+                                lambda: _remove(path + ".idx"))),
+            ("warm .idx", _best(lambda f: bdf.BDF(f, HostBitmap, path), path)),
+        )
+        print("{} ({} bytes), preload {!r} then {!r}".format(
+            os.path.basename(source), os.path.getsize(source), PRELOAD, MISS))
+        for name, (preload_s, preload_lines, miss_s, miss_lines) in results:
+            print("  {:9s} preload {:6.2f} ms {:5d} lines, miss {:6.2f} ms {:5d} lines".format(
+                name, preload_s * 1000, preload_lines, miss_s * 1000, miss_lines))
+    shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or [os.path.join(host_modules.CODE_DIR, name)
+                          for name in sorted(os.listdir(host_modules.CODE_DIR))
+                          if name.endswith(".bdf")])
@@ -0,0 +1,111 @@
+"""
+Report the bytes GifHelper sends to the display per frame.
+
+Runs on the host with regular Python:
+
+    python tools/bench_gif_bytes.py [gif ...]
+
+Plays every gif in code/gif (or the ones given) through GifHelper.play
+twice: the first time from the decoder, which also records the
+`.frames` sidecar of a short gif, and the second time from the sidecar
+if there is one. gifio is
+replaced by adafruit_imageload decoding into an RGB565 bitmap, and
+the display bus only counts bytes. Time is simulated, so no frame is
+dropped. A full frame is what the player sent before it only pushed
+the changed rows.
+"""
+import array
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import host_modules  # pylint: disable=wrong-import-position
+
+CLOCK = host_modules.Clock()
+host_modules.install(CLOCK)
+DEVICE_DIR = tempfile.mkdtemp(prefix="circuitpy-")
+host_modules.enter_device_dir(DEVICE_DIR)
+time.sleep = CLOCK.sleep
+
+# pylint: disable=wrong-import-position
+import gifio
+from adafruit_imageload import gif
+from host_modules import HostBitmap
+from hardware_helpers import display_helper, gif_helper
+# pylint: enable=wrong-import-position
+
+
+class RGB565Bitmap(array.array):
+    """The 16-bit bitmap gifio.OnDiskGif draws into"""
+
+    def __new__(cls, width, height):
+        bitmap = super().__new__(cls, "H", bytes(width * height * 2))
+        bitmap.width = width
+        bitmap.height = height
+        return bitmap
+
+
+class OnDiskGif:
+    """gifio.OnDiskGif on top of adafruit_imageload.gif"""
+
+    def __init__(self, file_name):
+        with open(file_name, "rb") as gif_file:
+            width, height = struct.unpack("<6xHH", gif_file.read(10))
+            gif_file.seek(0)
+            self.frame_count = sum(1 for _ in gif.iter_frames(
+                gif_file, bitmap=HostBitmap, palette=host_modules.Palette))
+        self.bitmap = RGB565Bitmap(width, height)
+        self._file = open(file_name, "rb")  # pylint: disable=consider-using-with
+        self._frames = gif.iter_frames(self._file, bitmap=HostBitmap, palette=host_modules.Palette)
+
+    def next_frame(self):
+        indices, palette, (x, y, width, height), delay_ms, _ = next(self._frames)
+        colors = [((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+                  for r, g, b in (palette[i] for i in range(len(palette)))]
+        bitmap = self.bitmap
+        for row in range(y, y + height):
+            start = row * bitmap.width
+            for column in range(start + x, start + x + width):
+                bitmap[column] = colors[indices[column]]
+        return delay_ms / 1000
+
+
+def _bytes_sent():
+    return sum(size for command, size in display_helper.display.bus.sent if command == 44)
+
+
+def _play(gif_file):
+    del display_helper.display.bus.sent[:]
+    gif_helper.play(gif_file)
+    stats = gif_helper.get_stats()
+    return stats["shown"], _bytes_sent() / stats["shown"], stats["bytes_per_frame"]
+
+
+def main(gif_files):
+    gifio.OnDiskGif = OnDiskGif
+    display_helper.display.bus = host_modules.Bus()
+    for source in gif_files:
+        gif_file = os.path.join("gif", os.path.basename(source))
+        if not os.path.exists(gif_file):
+            shutil.copy(source, gif_file)
+        odg = OnDiskGif(gif_file)
+        full_frame = odg.bitmap.width * odg.bitmap.height * 2
+        print("{} ({} frames, full frame {} bytes)".format(gif_file, odg.frame_count, full_frame))
+        for _ in range(2):
+            cache_kind = gif_helper._cache_kind(  # pylint: disable=protected-access
+                gif_file, gif_file + gif_helper._cache_suffix)  # pylint: disable=protected-access
+            name = "sidecar" if cache_kind == gif_helper._cache_magic else "decoder"  # pylint: disable=protected-access
+            shown, sent, reported = _play(gif_file)
+            print("  {}: {} frames, {:8.0f} bytes/frame sent, {:8.0f} reported, {:5.1%} of full".format(
+                name, shown, sent, reported, sent / full_frame))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or [os.path.join(host_modules.CODE_DIR, "gif", name)
+                          for name in sorted(os.listdir(os.path.join(host_modules.CODE_DIR, "gif")))
+                          if name.endswith(".gif")])
@@ -0,0 +1,210 @@
+"""
+Compare the gif decoder with the per-bit LZW decoder it replaced.
+
+Runs on the host with regular Python:
+
+    python tools/bench_gif_decode.py [gif ...]
+
+For every gif in code/gif (or the ones given) reports the best time of
+the LZW stage over all frames, sub-block reading included, and of a
+whole `load`, for the old decoder (copied below) and the current one.
+It also checks that both LZW stages produce the same pixel values; the
+loads differ on gifs with transparency, which the old decoder ignored.
+There is no bitmaptools on the host, so the current decoder writes the
+bitmap pixel by pixel there. On the device `bitmaptools.arrayblit`
+does that part.
+"""
+import io
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import host_modules  # pylint: disable=wrong-import-position
+
+host_modules.install()
+
+# pylint: disable=wrong-import-position
+from adafruit_imageload import gif
+from host_modules import HostBitmap
+# pylint: enable=wrong-import-position
+
+REPEAT = 5
+
+
+class _EndOfData(Exception):
+    pass
+
+
+class _LegacyLZWDict:
+    # pylint: disable=missing-function-docstring
+    def __init__(self, code_size):
+        self.code_size = code_size
+        self.clear_code = 1 << code_size
+        self.end_code = self.clear_code + 1
+        self.codes = []
+        self.last = b""
+        self.clear()
+
+    def clear(self):
+        self.last = b""
+        self.code_len = self.code_size + 1
+        self.codes[:] = []
+
+    def decode(self, code):
+        if code == self.clear_code:
+            self.clear()
+            return b""
+        if code == self.end_code:
+            raise _EndOfData()
+        if code < self.clear_code:
+            value = bytes([code])
+        elif code <= len(self.codes) + self.end_code:
+            value = self.codes[code - self.end_code - 1]
+        else:
+            value = self.last + self.last[0:1]
+        if self.last:
+            self.codes.append(self.last + value[0:1])
+        if len(self.codes) + self.end_code + 1 >= 1 << self.code_len and self.code_len < 12:
+            self.code_len += 1
+        self.last = value
+        return value
+
+
+def _legacy_lzw_decode(data, code_size):
+    dictionary = _LegacyLZWDict(code_size)
+    bit = 0
+    try:
+        byte = next(data)  # pylint: disable=stop-iteration-return
+        try:
+            while True:
+                code = 0
+                for i in range(dictionary.code_len):
+                    code |= ((byte >> bit) & 0x01) << i
+                    bit += 1
+                    if bit >= 8:
+                        bit = 0
+                        byte = next(data)  # pylint: disable=stop-iteration-return
+                yield dictionary.decode(code)
+        except _EndOfData:
+            while True:
+                next(data)  # pylint: disable=stop-iteration-return
+    except StopIteration:
+        pass
+
+
+def _legacy_blockstream(file):
+    while True:
+        size = file.read(1)[0]
+        if size == 0:
+            break
+        for _ in range(size):
+            yield file.read(1)[0]
+
+
+def _legacy_load(file, *, bitmap, palette=None):
+    bitmap_obj, palette_obj, _ = gif._read_header(file, bitmap, palette)  # pylint: disable=protected-access
+    while True:
+        block_type = file.read(1)[0]
+        if block_type == 0x2C:
+            ddx, ddy, width, _, flags = struct.unpack("<HHHHB", file.read(9))
+            if flags & 0x80:
+                file.read(3 << ((flags & 0x07) + 1))
+            x = 0
+            y = 0
+            for decoded in _legacy_lzw_decode(_legacy_blockstream(file), file.read(1)[0]):
+                for byte in decoded:
+                    bitmap_obj[ddx + x, ddy + y] = byte
+                    x += 1
+                    if x >= width:
+                        x = 0
+                        y += 1
+        elif block_type == 0x21:
+            file.read(1)
+            bytes(_legacy_blockstream(file))
+        elif block_type == 0x3B:
+            break
+        else:
+            raise ValueError("Bad block type")
+    return bitmap_obj, palette_obj
+
+
+def _frames(data):
+    """(pixel count, minimum code size, sub-blocks) of every frame"""
+    # pylint: disable=protected-access
+    file = io.BytesIO(data)
+    gif._read_header(file, HostBitmap, host_modules.Palette)
+    frames = []
+    while True:
+        block_type = file.read(1)[0]
+        if block_type == 0x2C:
+            (_, _, width, height), _ = gif._read_descriptor(file)
+            code_size = file.read(1)[0]
+            start = file.tell()
+            for _ in gif._read_blockstream(file):
+                pass
+            frames.append((width * height, code_size, data[start:file.tell()]))
+        elif block_type == 0x21:
+            file.read(1)
+            for _ in gif._read_blockstream(file):
+                pass
+        else:
+            return frames
+
+
+def _lzw_legacy(frames):
+    outputs = []
+    for _, code_size, blocks in frames:
+        outputs.append(b"".join(_legacy_lzw_decode(_legacy_blockstream(io.BytesIO(blocks)), code_size)))
+    return outputs
+
+
+def _lzw_current(frames):
+    # pylint: disable=protected-access
+    tables = gif._lzw_tables()
+    out = memoryview(bytearray(max(count for count, _, _ in frames)))
+    outputs = []
+    for count, code_size, blocks in frames:
+        decoded = gif.lzw_decode(gif._read_blockstream(io.BytesIO(blocks)), code_size, out[:count], tables)
+        outputs.append(bytes(out[:decoded]))
+    return outputs
+
+
+def _best(function, *args):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(gif_files):
+    for gif_file in gif_files:
+        with open(gif_file, "rb") as source:
+            data = source.read()
+        frames = _frames(data)
+        legacy_lzw, legacy_pixels = _best(_lzw_legacy, frames)
+        current_lzw, current_pixels = _best(_lzw_current, frames)
+        same = all(legacy[:count] == current for legacy, current, (count, _, _)
+                   in zip(legacy_pixels, current_pixels, frames))
+        legacy_load, _ = _best(
+            lambda: _legacy_load(io.BytesIO(data), bitmap=HostBitmap, palette=host_modules.Palette))
+        current_load, _ = _best(
+            lambda: gif.load(io.BytesIO(data), bitmap=HostBitmap, palette=host_modules.Palette))
+
+        print("{} ({} frames, {} compressed bytes)".format(
+            os.path.basename(gif_file), len(frames), sum(len(frame[2]) for frame in frames)))
+        print("  lzw:  {:7.1f} ms -> {:7.1f} ms ({:.1f}x), same output: {}".format(
+            legacy_lzw * 1000, current_lzw * 1000, legacy_lzw / current_lzw, same))
+        print("  load: {:7.1f} ms -> {:7.1f} ms ({:.1f}x)".format(
+            legacy_load * 1000, current_load * 1000, legacy_load / current_load))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or [os.path.join(host_modules.CODE_DIR, "gif", name)
+                          for name in sorted(os.listdir(os.path.join(host_modules.CODE_DIR, "gif")))
+                          if name.endswith(".gif")])
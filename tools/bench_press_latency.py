@@ -0,0 +1,102 @@
+"""
+Simulate the time from a button press to the display refresh showing it.
+
+Runs on the host with regular Python:
+
+    python tools/bench_press_latency.py
+
+Runs the tasks code.py schedules on a simulated clock and presses
+up/down in the main menu at random moments. Reports the latency from
+each press to the next display refresh, once with the buttons read
+every 10 ms as shipped and once with them read every 900 ms, the way
+the old loop only got to them between the clock's 0.4 s sleep and the
+0.5 s temperature sampling. Only simulated time is counted, the time
+the callbacks take on the device comes on top.
+"""
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import host_modules  # pylint: disable=wrong-import-position
+
+CLOCK = host_modules.Clock()
+host_modules.install(CLOCK)
+host_modules.enter_device_dir(tempfile.mkdtemp(prefix="circuitpy-"))
+
+# pylint: disable=wrong-import-position
+import settings
+from hardware_helpers import display_helper, temp_helper, dfplayer_helper
+from scheduler import Scheduler
+from screen_manager import ScreenManager
+# pylint: enable=wrong-import-position
+
+PRESSES = 200
+HOLD_MS = 120
+
+
+def _run_until(scheduler, end_ms):
+    while CLOCK.now_ms < end_ms:
+        wait_ms = scheduler.run_once()
+        CLOCK.advance(min(wait_ms, end_ms - CLOCK.now_ms))
+
+
+def _latencies(button_period_ms):
+    manager = ScreenManager()
+    scheduler = Scheduler()
+    scheduler.add_task(manager.read_buttons, button_period_ms)
+    scheduler.add_task(manager.refresh, 400)
+    scheduler.add_task(temp_helper.sample, temp_helper.sample_period_ms)
+    scheduler.add_task(dfplayer_helper.update, 10)
+    scheduler.add_task(settings.store.update, 500)
+
+    refreshes = []
+    display = display_helper.display
+    display_refresh = display.refresh
+
+    def recording_refresh(**kwargs):
+        refreshes.append(CLOCK.now_ms)
+        return display_refresh(**kwargs)
+
+    display.refresh = recording_refresh
+
+    # open the main menu, where only button presses change the screen
+    host_modules.press(settings.fwd_btn_pin, manager.read_buttons, CLOCK)
+    _run_until(scheduler, CLOCK.now_ms + 1000)
+
+    rng = random.Random(1)
+    latencies = []
+    for n in range(PRESSES):
+        pin = host_modules.pins[settings.down_btn_pin if n % 2 else settings.up_btn_pin]
+        _run_until(scheduler, CLOCK.now_ms + rng.randrange(200, 1200))
+        pressed_at = CLOCK.now_ms
+        del refreshes[:]
+        pin.value = False
+        _run_until(scheduler, pressed_at + HOLD_MS)
+        pin.value = True
+        _run_until(scheduler, pressed_at + 2000)
+        if refreshes:
+            latencies.append(refreshes[0] - pressed_at)
+
+    display.refresh = display_refresh
+    return latencies
+
+
+def _report(name, latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        print("{}: none of {} presses shown".format(name, PRESSES))
+        return
+    print("{}: {} of {} presses shown, latency min {} / median {} / max {} ms".format(
+        name, len(latencies), PRESSES, latencies[0], latencies[len(latencies) // 2], latencies[-1]))
+
+
+def main():
+    _report("buttons every  10 ms", _latencies(10))
+    _report("buttons every 900 ms", _latencies(900))
+
+
+if __name__ == "__main__":
+    main()
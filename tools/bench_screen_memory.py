@@ -0,0 +1,97 @@
+"""
+Measure the memory high-water mark of a scripted screen navigation.
+
+Runs on the host with regular Python:
+
+    python tools/bench_screen_memory.py
+
+Walks the menus with the pooled ScreenManager and with one that builds
+a new screen on every visit, and reports the screens constructed and,
+from tracemalloc, the peak and the still allocated Python heap. Host
+object sizes differ from the device, the comparison is what carries
+over.
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import host_modules  # pylint: disable=wrong-import-position
+
+CLOCK = host_modules.Clock()
+host_modules.install(CLOCK)
+host_modules.enter_device_dir(tempfile.mkdtemp(prefix="circuitpy-"))
+
+# pylint: disable=wrong-import-position
+import settings
+import screen
+from screen_manager import ScreenManager
+# pylint: enable=wrong-import-position
+
+ROUNDS = 10
+# from the clock through volume, brightness, clock color and back
+ROUND = (
+    "fwd",
+    "down", "down", "fwd", "up", "down", "back",
+    "down", "fwd", "up", "back",
+    "up", "up", "fwd", "down", "back",
+    "up", "back",
+)
+
+
+class UnpooledScreenManager(ScreenManager):
+    """Builds the next screen on every navigation"""
+
+    def _get_screen(self, screen_class, prev_screen):
+        return screen_class(prev_screen)
+
+
+def _navigate(manager_class, rounds, traced=True):
+    constructed = []
+    screen_init = screen.Screen.__init__
+
+    def counting_init(self, prev_screen=None):
+        constructed.append(type(self).__name__)
+        screen_init(self, prev_screen)
+
+    screen.Screen.__init__ = counting_init
+    pin_names = {
+        "up": settings.up_btn_pin,
+        "down": settings.down_btn_pin,
+        "fwd": settings.fwd_btn_pin,
+        "back": settings.back_btn_pin,
+    }
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    try:
+        manager = manager_class()
+        for _ in range(rounds):
+            for button in ROUND:
+                host_modules.press(pin_names[button], manager.read_buttons, CLOCK)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        screen.Screen.__init__ = screen_init
+    return len(constructed), current, peak
+
+
+def main():
+    managers = (("new screen per visit", UnpooledScreenManager),
+                ("pooled screens      ", ScreenManager))
+    # fonts, settings and every lazily built object outside the measurement
+    for _, manager_class in managers:
+        _navigate(manager_class, 1, traced=False)
+
+    print("{} rounds of {} presses".format(ROUNDS, len(ROUND)))
+    for name, manager_class in managers:
+        constructed, current, peak = _navigate(manager_class, ROUNDS)
+        print("{}: {:3d} screens built, peak {:7.1f} KiB, still allocated {:7.1f} KiB".format(
+            name, constructed, peak / 1024, current / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Count the settings file accesses of a scripted menu session.
+
+Runs on the host with regular Python:
+
+    python tools/bench_settings_opens.py
+
+Drives ScreenManager through the same button presses twice: once with
+the settings store as shipped and once with a store that reads the file
+on every access and writes it on every change, the way
+read_persistent_settings/save_persistent_settings used to. Reports the
+opens of each kind. Each run starts from the shipped settings.json in
+a scratch directory.
+"""
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import host_modules  # pylint: disable=wrong-import-position
+
+CLOCK = host_modules.Clock()
+host_modules.install(CLOCK)
+
+import settings  # pylint: disable=wrong-import-position
+
+SESSION = (
+    "fwd",                                      # clock -> menu
+    "down", "down", "fwd", "up", "up", "down", "back",          # volume
+    "down", "fwd", "down", "down", "back",                      # brightness
+    "up", "up", "fwd", "down", "down", "fwd",   # clock color, back to the clock
+    "fwd",
+    "down", "down", "down", "down", "fwd", "down", "fwd", "up", "fwd", "back",  # gif
+    "up", "up", "up", "up", "back",
+)
+IDLE_MS = 300
+
+
+class ReadThroughStore(settings.SettingsStore):
+    """Reads the file on every access and writes it on every change"""
+
+    def _load(self):
+        self._settings = None
+        return super()._load()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.flush()
+
+
+def _count_opens(run):
+    opens = {"read": 0, "write": 0}
+    real_open = builtins.open
+
+    def counting_open(file, mode="r", *args, **kwargs):
+        if str(file).startswith(settings.settings_file_name):
+            opens["write" if "w" in mode else "read"] += 1
+        return real_open(file, mode, *args, **kwargs)
+
+    builtins.open = counting_open
+    try:
+        run()
+    finally:
+        builtins.open = real_open
+    return opens
+
+
+def _session():
+    from screen_manager import ScreenManager  # pylint: disable=import-outside-toplevel
+
+    manager = ScreenManager()
+
+    def poll():
+        manager.read_buttons()
+        settings.store.update()
+
+    pin_names = {
+        "up": settings.up_btn_pin,
+        "down": settings.down_btn_pin,
+        "fwd": settings.fwd_btn_pin,
+        "back": settings.back_btn_pin,
+    }
+    for button in SESSION:
+        host_modules.press(pin_names[button], poll, CLOCK)
+        CLOCK.advance(IDLE_MS)
+        poll()
+    # let the write-behind flush land
+    CLOCK.advance(settings.settings_flush_delay_ms)
+    poll()
+
+
+def _measure(store):
+    path = tempfile.mkdtemp(prefix="circuitpy-")
+    # start from the settings the drive ships with
+    shutil.copy(os.path.join(host_modules.CODE_DIR, settings.settings_file_name), path)
+    host_modules.enter_device_dir(path)
+    settings.store = store
+    return _count_opens(_session)
+
+
+def main():
+    store_args = (settings.settings_file_name, settings.default_settings,
+                  settings.settings_flush_delay_ms, settings.JsonCodec())
+    read_through = _measure(ReadThroughStore(*store_args))
+    cached = _measure(settings.SettingsStore(*store_args))
+
+    print("{} presses".format(len(SESSION)))
+    print("read through: {read} reads, {write} writes".format(**read_through))
+    print("store:        {read} reads, {write} writes".format(**cached))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare the thermistor conversions TempHelper can use.
+
+Runs on the host with regular Python:
+
+    python tools/bench_temp_lookup.py
+
+Reports the time per conversion of the closed-form Steinhart-Hart path
+and of the ADC lookup table, and the largest difference between them.
+Absolute times are for the host; the ratio is what carries over.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "code", "lib"))
+
+from SH_converter import SH_converter  # pylint: disable=wrong-import-position
+
+CALIBRATION = ((-16, 33000), (8, 10000), (22.7, 5333))
+R_REF = 10030
+V_REF = 65535
+READINGS = range(3000, 63001, 7)
+
+
+def _time_per_call(convert, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for adc in READINGS:
+            convert(adc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(READINGS)
+
+
+def main():
+    converter = SH_converter.from_points(CALIBRATION)
+    lookup = converter.adc_lookup(R_REF)
+
+    def closed_form(adc):
+        return converter.temperature(R_REF * (V_REF / adc - 1))
+
+    closed_form_s = _time_per_call(closed_form)
+    lookup_s = _time_per_call(lookup.temperature)
+    worst = max(abs(lookup.temperature(adc) - closed_form(adc)) for adc in READINGS)
+
+    print("closed form: {:.3f} us/conversion".format(closed_form_s * 1e6))
+    print("lookup:      {:.3f} us/conversion ({:.1f}x)".format(
+        lookup_s * 1e6, closed_form_s / lookup_s))
+    print("max error:   {:.3f} C over ADC {}-{}".format(worst, READINGS.start, READINGS.stop - 1))
+
+
+if __name__ == "__main__":
+    main()
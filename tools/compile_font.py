@@ -0,0 +1,123 @@
+"""
+Compile a BDF or PCF font into a pre-rasterized glyph atlas (.bfa).
+
+Runs on the host with regular Python:
+
+    python tools/compile_font.py code/FSSevegment-40.bdf code/FSSevegment-40.bfa
+
+The atlas is read by adafruit_bitmap_font.atlas; see there for the
+file layout. Pass --chars to keep only the glyphs the UI needs.
+"""
+import argparse
+import os
+import struct
+
+from host_modules import HostBitmap, install
+
+
+def _code_points(font):
+    """Every code point the font may contain"""
+    if hasattr(font, "_build_index"):
+        font._build_index()  # pylint: disable=protected-access
+        return sorted(font._index)  # pylint: disable=protected-access
+    encoding = font._encoding  # pylint: disable=protected-access
+    return [
+        (byte1 << 8) | byte2
+        for byte1 in range(encoding.min_byte1, encoding.max_byte1 + 1)
+        for byte2 in range(encoding.min_byte2, encoding.max_byte2 + 1)
+    ]
+
+
+def _pack_bits(glyph):
+    data = bytearray()
+    for y in range(glyph.height):
+        row = bytearray((glyph.width + 7) // 8)
+        for x in range(glyph.width):
+            if glyph.bitmap[y * glyph.width + x]:
+                row[x // 8] |= 128 >> (x % 8)
+        data += row
+    return data
+
+
+def compile_font(source, target, chars=None):
+    install()
+    # pylint: disable=import-outside-toplevel
+    from adafruit_bitmap_font import bitmap_font
+    from adafruit_bitmap_font import atlas
+    from adafruit_bitmap_font import bdf
+
+    if source.endswith(".bdf"):
+        # without a filename the BDF keeps its glyph index in memory
+        # instead of writing a .idx file into the source tree
+        font = bdf.BDF(open(source, "rb"), HostBitmap)  # pylint: disable=consider-using-with
+    else:
+        font = bitmap_font.load_font(source, HostBitmap)
+    if chars:
+        code_points = sorted(set(ord(c) for c in chars))
+    else:
+        code_points = _code_points(font)
+    font.load_glyphs(code_points)
+
+    glyphs = []
+    for code_point in code_points:
+        glyph = font.get_glyph(code_point)
+        if glyph is not None:
+            glyphs.append((code_point, glyph))
+
+    header_size = struct.calcsize(atlas.HEADER_FORMAT)
+    metrics_size = struct.calcsize(atlas.METRICS_FORMAT)
+    offset = header_size + metrics_size * len(glyphs)
+    metrics = bytearray()
+    bits = bytearray()
+    for code_point, glyph in glyphs:
+        metrics += struct.pack(
+            atlas.METRICS_FORMAT,
+            code_point,
+            glyph.width,
+            glyph.height,
+            glyph.dx,
+            glyph.dy,
+            glyph.shift_x,
+            glyph.shift_y,
+            offset + len(bits),
+        )
+        bits += _pack_bits(glyph)
+
+    width, height, x_offset, y_offset = font.get_bounding_box()
+    header = struct.pack(
+        atlas.HEADER_FORMAT,
+        atlas.MAGIC,
+        atlas.VERSION,
+        width,
+        height,
+        x_offset,
+        y_offset,
+        font.ascent or 0,
+        font.descent or 0,
+        len(glyphs),
+    )
+    with open(target, "wb") as target_file:
+        target_file.write(header + metrics + bits)
+    return len(glyphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("source", help="BDF or PCF font")
+    parser.add_argument("target", help="atlas file to write, should end in .bfa")
+    parser.add_argument("--chars", help="only compile these characters")
+    args = parser.parse_args()
+
+    count = compile_font(args.source, args.target, args.chars)
+    print(
+        "{}: {} glyphs, {} -> {} bytes".format(
+            args.target,
+            count,
+            os.path.getsize(args.source),
+            os.path.getsize(args.target),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
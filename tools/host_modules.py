@@ -0,0 +1,280 @@
+"""
+Host stand-ins for the CircuitPython modules the device code imports.
+
+    import host_modules
+    host_modules.install()
+
+Call `install` before importing any device module. Only what the host
+tests and the tools/bench_* scripts touch is modelled: displayio groups
+keep their children, the display counts refreshes and bus writes, the
+buttons are plain pins a script can press, and the DFPlayer UART records
+what is sent and only answers with what a script feeds it.
+
+A script that needs repeatable timing passes a `Clock` to `install`;
+every ticks_ms() in the device code then reads it instead of wall time.
+"""
+import os
+import shutil
+import sys
+import time
+import types
+from collections import namedtuple
+
+CODE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
+LIB_DIR = os.path.join(CODE_DIR, "lib")
+
+# DigitalInOut stand-ins by board pin name, for scripts that press buttons
+pins = {}
+
+
+class Clock:
+    """supervisor.ticks_ms that only moves when the script advances it"""
+
+    def __init__(self):
+        self.now_ms = 0
+
+    def ticks_ms(self):
+        return self.now_ms % (1 << 29)
+
+    def advance(self, ms):
+        self.now_ms += ms
+
+    def sleep(self, seconds):
+        """time.sleep replacement: waiting only moves the clock"""
+        self.advance(round(seconds * 1000))
+
+
+class HostBitmap:
+    """displayio.Bitmap with one byte per pixel"""
+
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self._pixels = bytearray(width * height)
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        return self._pixels[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        self._pixels[index] = value
+
+    def fill(self, value):
+        self._pixels[:] = bytes([value]) * len(self._pixels)
+
+
+class Group(list):
+    """displayio.Group: an ordered list of children, compared by identity"""
+
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+    def __init__(self, *, scale=1, x=0, y=0):
+        super().__init__()
+        # bypass the properties subclasses such as Label put over these
+        vars(self).update(scale=scale, x=x, y=y, hidden=False)
+
+
+class TileGrid:
+    def __init__(self, bitmap, *, pixel_shader, default_tile=0, tile_width=None,
+                 tile_height=None, width=1, height=1, x=0, y=0):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.default_tile = default_tile
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+
+class Palette:
+    def __init__(self, color_count):
+        self._colors = [0] * color_count
+        self._transparent = set()
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        self._colors[index] = color
+
+    def make_transparent(self, index):
+        self._transparent.add(index)
+
+    def make_opaque(self, index):
+        self._transparent.discard(index)
+
+
+class Button(Group):
+    """adafruit_button.Button, reduced to the state ListMenu drives"""
+
+    def __init__(self, *, x=0, y=0, label="", label_color=None, selected_fill=None,
+                 selected_outline=None, **kwargs):
+        super().__init__(x=x, y=y)
+        self.label = label
+        self.label_color = label_color
+        self.selected_fill = selected_fill
+        self.selected_outline = selected_outline
+        self.selected = False
+        self.options = kwargs
+
+
+class Bus:
+    """displayio.FourWire: remembers how many bytes each command carried"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, command, data):
+        self.sent.append((command, len(memoryview(data).cast("B"))))
+
+
+class Display:
+    def __init__(self, bus, **kwargs):
+        self.bus = bus
+        self.auto_refresh = True
+        self.refresh_count = 0
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        self.refresh_count += 1
+        return True
+
+
+class Pin:
+    """digitalio.DigitalInOut; buttons idle high"""
+
+    def __init__(self, pin=None):
+        self.pin = pin
+        self.value = True
+        self.direction = None
+        self.pull = None
+        pins[pin] = self
+
+
+class AnalogIn:
+    def __init__(self, pin=None):
+        self.pin = pin
+        self.value = 32768
+
+
+class PWMOut:
+    def __init__(self, pin=None, *, frequency=500, duty_cycle=0):
+        self.pin = pin
+        self.frequency = frequency
+        self.duty_cycle = duty_cycle
+
+
+class UART:
+    def __init__(self, tx=None, rx=None, *, baudrate=9600, **kwargs):
+        self.written = []
+        self._received = bytearray()
+
+    @property
+    def in_waiting(self):
+        return len(self._received)
+
+    def receive(self, data):
+        """Queue bytes for the device code to read"""
+        self._received += data
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        return len(data)
+
+    def readinto(self, buffer):
+        count = min(len(buffer), len(self._received))
+        buffer[:count] = self._received[:count]
+        del self._received[:count]
+        return count
+
+
+class RTC:
+    def __init__(self, i2c=None):
+        self.datetime = time.struct_time((2024, 1, 1, 12, 34, 0, 0, 1, -1))
+
+
+class _Ignored:
+    """Accepts any constructor arguments and ignores them"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def _module(name, **attributes):
+    module = sys.modules.get(name)
+    if module is None:
+        module = types.ModuleType(name)
+        sys.modules[name] = module
+    for key, value in attributes.items():
+        if not hasattr(module, key):
+            setattr(module, key, value)
+    return module
+
+
+def install(clock=None):
+    """Register the stand-ins for every module that isn't importable"""
+    if clock is not None:
+        # must happen before adafruit_ticks is first imported
+        _module("supervisor", ticks_ms=clock.ticks_ms)
+    if LIB_DIR not in sys.path:
+        sys.path.insert(0, LIB_DIR)
+
+    _module("micropython", const=lambda value: value)
+    # the libraries evaluate their type hints on the host
+    _module("fontio", FontProtocol=object,
+            Glyph=namedtuple("Glyph", "bitmap tile_index width height dx dy shift_x shift_y"))
+    _module("circuitpython_typing", ReadableBuffer=bytes, WriteableBuffer=bytearray)
+    _module("circuitpython_typing.io", ROValueIO=object)
+    board = _module("board")
+    board.__getattr__ = lambda name: name
+    _module("displayio", Bitmap=HostBitmap, Group=Group, TileGrid=TileGrid, Palette=Palette,
+            FourWire=lambda *args, **kwargs: Bus(), release_displays=lambda: None)
+    _module("terminalio", FONT=object())
+    _module("microcontroller", reset=lambda: None)
+    _module("busio", SPI=_Ignored, I2C=_Ignored, UART=UART)
+    _module("pwmio", PWMOut=PWMOut)
+    _module("analogio", AnalogIn=AnalogIn)
+    _module("digitalio", DigitalInOut=Pin,
+            Direction=types.SimpleNamespace(INPUT="input", OUTPUT="output"),
+            Pull=types.SimpleNamespace(UP="up", DOWN="down"))
+    _module("gifio")
+    _module("adafruit_st7735r", ST7735R=Display)
+    _module("adafruit_ds3231", DS3231=RTC)
+    _module("adafruit_button", Button=Button)
+
+
+def enter_device_dir(path):
+    """
+    Make `path` the working directory, holding the fonts and gifs from
+    code/. The device code opens its files relative to the root of the
+    CIRCUITPY drive, and settings.json is created here instead of in
+    the source tree.
+    """
+    for name in os.listdir(CODE_DIR):
+        if name.endswith(".bfa"):
+            shutil.copy(os.path.join(CODE_DIR, name), path)
+    gif_dir = os.path.join(path, "gif")
+    if not os.path.isdir(gif_dir):
+        shutil.copytree(os.path.join(CODE_DIR, "gif"), gif_dir)
+    os.chdir(path)
+
+
+def press(pin, poll, clock, interval_ms=10):
+    """
+    Push and release the button on board pin `pin`, advancing `clock`
+    and calling `poll` every `interval_ms` like the scheduler would, so
+    the debouncer reports exactly one press.
+    """
+    for value in (False, True):
+        pins[pin].value = value
+        for _ in range(3):
+            clock.advance(interval_ms)
+            poll()